@@ -76,20 +76,34 @@ def make_leagues_table(metadata: MetaData) -> Table:
 # Upsert logic
 # ---------------------------------------------------------------------
 
+# Table built once at import; create_all runs once per process instead of
+# probing the catalog on every upsert/delete call.
+_MD = MetaData()
+_LEAGUES_TABLE = make_leagues_table(_MD)
+_SCHEMA_ENSURED = False
+
+
+def _ensure_schema(engine) -> None:
+    global _SCHEMA_ENSURED
+    if not _SCHEMA_ENSURED:
+        _MD.create_all(engine)
+        _SCHEMA_ENSURED = True
+
+
 def upsert_leagues(
     engine,
     league_rows: Sequence[Dict[str, Any]],
 ) -> int:
-    metadata = MetaData()
-    leagues = make_leagues_table(metadata)
-
-    # Create table if it does not exist
-    metadata.create_all(engine)
+    _ensure_schema(engine)
+    leagues = _LEAGUES_TABLE
 
     if not league_rows:
         return 0
 
-    stmt = pg_insert(leagues).values(list(league_rows))
+    # avoid re-copying the row list main() already materialized
+    if not isinstance(league_rows, list):
+        league_rows = list(league_rows)
+    stmt = pg_insert(leagues).values(league_rows)
 
     stmt = stmt.on_conflict_do_update(
         index_elements=[leagues.c.league_id],
@@ -113,8 +127,8 @@ def delete_missing_leagues(engine, keep_ids: set[int], provider: str) -> int:
     """
     Delete rows from public.leagues that are NOT in keep_ids (for this provider).
     """
-    metadata = MetaData()
-    leagues = make_leagues_table(metadata)
+    _ensure_schema(engine)
+    leagues = _LEAGUES_TABLE
 
     # If keep_ids is empty -> delete everything for this provider
     cond = (leagues.c.provider == provider)
@@ -137,6 +151,9 @@ def main(
     provider = get_current_provider().strip().lower()
     engine = get_engine()
 
+    # run DDL once up-front; upsert/delete below reuse the ensured schema
+    _ensure_schema(engine)
+
     league_ids = set(load_league_ids(league_ids_yaml))
     all_leagues = fetch_all_leagues(provider)
 
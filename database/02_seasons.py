@@ -13,12 +13,16 @@ Behavior:
 
 from __future__ import annotations
 
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from functools import lru_cache
 from pathlib import Path
 from typing import Any, Dict, List, Sequence, Set, Tuple, Union
 
 import re
+import orjson
 import yaml
 import requests
+from requests.adapters import HTTPAdapter
 
 from sqlalchemy import (
     MetaData,
@@ -31,8 +35,9 @@ from sqlalchemy import (
     select,
     delete,
     func,
+    text,
 )
-from sqlalchemy.dialects.postgresql import insert as pg_insert
+from psycopg2.extras import execute_values
 
 from api_calls.helpers.general import get_current_provider
 from api_calls.helpers.providers.general import get_url
@@ -63,6 +68,10 @@ def load_season_names(yaml_path: Union[str, Path]) -> List[str]:
     return out
 
 
+_START_YEAR_RE = re.compile(r"^(\d{4})")
+
+
+@lru_cache(maxsize=4096)
 def _season_start_year(name: str) -> str | None:
     """
     Extract a "start year" key from season label.
@@ -70,78 +79,108 @@ def _season_start_year(name: str) -> str | None:
       "2024/2025" -> "2024"
       "2024"      -> "2024"
       " 2024/25 " -> "2024" (best effort if it begins with 4-digit year)
+
+    Cached: the same labels recur once per league across the whole run.
     """
     name = str(name).strip()
-    m = re.match(r"^(\d{4})", name)
+    m = _START_YEAR_RE.match(name)
     return m.group(1) if m else None
 
 
-def _build_allowed_keys(yaml_seasons: Sequence[str]) -> Tuple[Set[str], Set[str]]:
+def _build_allowed_keys(yaml_seasons: Sequence[str]) -> Tuple[Set[str], Set[str], Dict[str, List[str]]]:
     """
     Returns:
       allowed_exact: exact strings, stripped
       allowed_start_years: start-year keys (e.g. {"2024","2020"})
+      yaml_by_year: start-year -> YAML entries sharing it (O(1) matched-yaml
+                    bookkeeping instead of rescanning allowed_exact)
     """
     allowed_exact = {str(s).strip() for s in yaml_seasons if str(s).strip()}
     allowed_years: Set[str] = set()
+    yaml_by_year: Dict[str, List[str]] = {}
     for s in allowed_exact:
         y = _season_start_year(s)
         if y:
             allowed_years.add(y)
-    return allowed_exact, allowed_years
+            yaml_by_year.setdefault(y, []).append(s)
+    return allowed_exact, allowed_years, yaml_by_year
 
 
 # -------------------------
 # SportMonks fetch
 # -------------------------
+
+# One pooled keep-alive session for all season pages: saves the TCP+TLS
+# handshake on every request after the first (gzip is negotiated by default).
+_SESSION = requests.Session()
+_SESSION.mount("https://", HTTPAdapter(pool_connections=32, pool_maxsize=32))
+
+
+def _fetch_seasons_page(url: str, api_token: str, league_id: int, page: int) -> Dict[str, Any]:
+    r = _SESSION.get(
+        url,
+        params={
+            "api_token": api_token,
+            "filters": f"seasonLeagues:{league_id}",
+            "per_page": 50,
+            "page": page,
+        },
+        timeout=30,
+    )
+    r.raise_for_status()
+    # orjson decodes the raw bytes faster than r.json() — noticeable
+    # across hundreds of paginated 50-row responses
+    return orjson.loads(r.content)
+
+
+def _page_data(payload: Dict[str, Any]) -> List[Dict[str, Any]]:
+    data = payload.get("data", [])
+    if isinstance(data, dict):
+        data = [data]
+    if not isinstance(data, list):
+        data = []
+    return [x for x in data if isinstance(x, dict)]
+
+
 def _sportmonks_fetch_seasons_for_league(provider: str, league_id: int) -> List[Dict[str, Any]]:
     """
     SportMonks: GET /seasons?filters=seasonLeagues:{league_id}
     Handles paging (best-effort).
+
+    Page 1 is fetched synchronously to learn last_page; the remaining pages
+    are fetched concurrently. When pagination metadata is missing, falls
+    back to the sequential walk.
     """
     params = get_access_params(provider)
     api_token = params["api_token"]
 
     url = get_url(provider, "seasons")
 
-    out: List[Dict[str, Any]] = []
-    page = 1
-
-    while True:
-        r = requests.get(
-            url,
-            params={
-                "api_token": api_token,
-                "filters": f"seasonLeagues:{league_id}",
-                "per_page": 50,
-                "page": page,
-            },
-            timeout=30,
-        )
-        r.raise_for_status()
-        payload = r.json()
-
-        data = payload.get("data", [])
-        if isinstance(data, dict):
-            data = [data]
-        if not isinstance(data, list):
-            data = []
-
-        out.extend([x for x in data if isinstance(x, dict)])
-
-        # Pagination is sometimes in payload["pagination"], sometimes in meta.
-        pagination = payload.get("pagination") or payload.get("meta", {}).get("pagination") or {}
-        has_more = False
-
-        if isinstance(pagination, dict):
-            current_page = pagination.get("current_page")
-            last_page = pagination.get("last_page")
-            if isinstance(current_page, int) and isinstance(last_page, int) and current_page < last_page:
-                has_more = True
-
-        # Fallback: if we got < per_page, likely done
-        if not has_more and len(data) < 50:
-            break
+    payload = _fetch_seasons_page(url, api_token, league_id, 1)
+    data = _page_data(payload)
+    out: List[Dict[str, Any]] = list(data)
+
+    # Pagination is sometimes in payload["pagination"], sometimes in meta.
+    pagination = payload.get("pagination") or payload.get("meta", {}).get("pagination") or {}
+    last_page = pagination.get("last_page") if isinstance(pagination, dict) else None
+
+    if isinstance(last_page, int) and last_page > 1:
+        last_page = min(last_page, 200)  # avoid pathological metadata
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            pages = pool.map(
+                lambda p: _page_data(_fetch_seasons_page(url, api_token, league_id, p)),
+                range(2, last_page + 1),
+            )
+            for page_rows in pages:
+                out.extend(page_rows)
+        return out
+
+    # Fallback: no usable last_page — keep walking while pages come back full
+    page = 2
+    while len(data) >= 50:
+        payload = _fetch_seasons_page(url, api_token, league_id, page)
+        data = _page_data(payload)
+        out.extend(data)
 
         page += 1
 
@@ -179,64 +218,101 @@ def make_seasons_table(metadata: MetaData) -> Table:
     )
 
 
-def upsert_seasons(engine, season_rows: Sequence[Dict[str, Any]]) -> int:
-    metadata = MetaData()
-    seasons = make_seasons_table(metadata)
-
-    # create if not exists
-    metadata.create_all(engine)
+# Tables built once at import; create_all runs once per process instead of
+# probing the catalog on every upsert/delete call. The minimal leagues shape
+# lives in its own MetaData so it is never subject to create_all (it only
+# mirrors the table owned by 01_leagues for reading).
+_MD = MetaData()
+_SEASONS_TABLE = make_seasons_table(_MD)
+_LEAGUES_TABLE = make_leagues_table(MetaData())
+_SCHEMA_ENSURED = False
+
+
+def _ensure_schema(engine) -> None:
+    global _SCHEMA_ENSURED
+    if not _SCHEMA_ENSURED:
+        _MD.create_all(engine)
+        _SCHEMA_ENSURED = True
+
+
+_SEASONS_COLUMNS = ("season_id", "season_name", "league_id", "is_current", "provider")
+
+# One multi-VALUES statement per page via execute_values instead of
+# recompiling a pg_insert(...).values([...]) of growing arity per call.
+# The IS DISTINCT FROM guard keeps updated_at untouched when nothing changed.
+_SEASONS_UPSERT_SQL = """
+    INSERT INTO public.seasons (season_id, season_name, league_id, is_current, provider)
+    VALUES %s
+    ON CONFLICT (season_id)
+    DO UPDATE SET
+        season_name = EXCLUDED.season_name,
+        league_id = EXCLUDED.league_id,
+        is_current = EXCLUDED.is_current,
+        provider = EXCLUDED.provider,
+        updated_at = now()
+    WHERE seasons.season_name IS DISTINCT FROM EXCLUDED.season_name
+       OR seasons.league_id IS DISTINCT FROM EXCLUDED.league_id
+       OR seasons.is_current IS DISTINCT FROM EXCLUDED.is_current
+       OR seasons.provider IS DISTINCT FROM EXCLUDED.provider
+"""
 
-    if not season_rows:
-        return 0
+_PAGE_SIZE = 500
 
-    stmt = pg_insert(seasons).values(list(season_rows))
 
-    # Only update when something actually changed (null-safe)
-    changed_cond = (
-        seasons.c.season_name.is_distinct_from(stmt.excluded.season_name)
-        | seasons.c.league_id.is_distinct_from(stmt.excluded.league_id)
-        | seasons.c.is_current.is_distinct_from(stmt.excluded.is_current)
-        | seasons.c.provider.is_distinct_from(stmt.excluded.provider)
-    )
+def upsert_seasons(engine, season_rows: Sequence[Dict[str, Any]]) -> int:
+    _ensure_schema(engine)
 
-    stmt = stmt.on_conflict_do_update(
-        index_elements=[seasons.c.season_id],
-        set_={
-            "season_name": stmt.excluded.season_name,
-            "league_id": stmt.excluded.league_id,
-            "is_current": stmt.excluded.is_current,
-            "provider": stmt.excluded.provider,
-            "updated_at": func.now(),
-        },
-        where=changed_cond,  # <-- critical: updated_at only when changed
-    )
+    if not season_rows:
+        return 0
 
-    with engine.begin() as conn:
-        res = conn.execute(stmt)
-        return int(res.rowcount or 0)
+    vals = [tuple(r[c] for c in _SEASONS_COLUMNS) for r in season_rows]
+
+    raw = engine.raw_connection()
+    try:
+        cur = raw.cursor()
+        # page manually so rowcount (last statement only) can be summed
+        changed = 0
+        for start in range(0, len(vals), _PAGE_SIZE):
+            execute_values(cur, _SEASONS_UPSERT_SQL, vals[start:start + _PAGE_SIZE], page_size=_PAGE_SIZE)
+            changed += int(cur.rowcount or 0)
+        raw.commit()
+        return changed
+    except Exception:
+        raw.rollback()
+        raise
+    finally:
+        raw.close()
 
 
 def delete_seasons_not_in_yaml(engine, *, provider: str, keep_season_ids: Set[int]) -> int:
     """
     Delete seasons for this provider that are not in the YAML-selected set.
     """
-    metadata = MetaData()
-    seasons = make_seasons_table(metadata)
-
-    # Ensure table exists
-    metadata.create_all(engine)
+    _ensure_schema(engine)
+    seasons = _SEASONS_TABLE
 
     with engine.begin() as conn:
         if keep_season_ids:
-            stmt = delete(seasons).where(
-                seasons.c.provider == provider,
-                ~seasons.c.season_id.in_(keep_season_ids),
+            # Anti-join against the unnested keep-set: the planner can hash
+            # it, instead of scanning a NOT IN (...) literal list per row.
+            res = conn.execute(
+                text(
+                    """
+                    DELETE FROM public.seasons s
+                    WHERE s.provider = :provider
+                      AND NOT EXISTS (
+                          SELECT 1
+                          FROM unnest(CAST(:keep_ids AS int[])) AS k(id)
+                          WHERE k.id = s.season_id
+                      )
+                    """
+                ),
+                {"provider": provider, "keep_ids": sorted(keep_season_ids)},
             )
         else:
             # If YAML selection yields nothing, delete all seasons for this provider
-            stmt = delete(seasons).where(seasons.c.provider == provider)
+            res = conn.execute(delete(seasons).where(seasons.c.provider == provider))
 
-        res = conn.execute(stmt)
         return int(res.rowcount or 0)
 
 
@@ -249,13 +325,15 @@ def main(
     provider = get_current_provider(default="sportmonks").strip().lower()
     engine = get_engine()
 
+    # run DDL once up-front; upsert/delete below reuse the ensured schema
+    _ensure_schema(engine)
+
     # 1) Load YAML season names
     yaml_seasons = load_season_names(seasons_yaml)
-    allowed_exact, allowed_years = _build_allowed_keys(yaml_seasons)
+    allowed_exact, allowed_years, yaml_by_year = _build_allowed_keys(yaml_seasons)
 
     # 2) Get league_ids from public.leagues
-    md = MetaData()
-    leagues = make_leagues_table(md)
+    leagues = _LEAGUES_TABLE
 
     with engine.begin() as conn:
         league_ids = [int(r[0]) for r in conn.execute(select(leagues.c.league_id)).fetchall()]
@@ -264,16 +342,27 @@ def main(
         print("No leagues found in public.leagues. Add leagues first, then re-run.")
         return
 
-    # 3) Fetch seasons for each league and match
+    # 3) Fetch seasons for each league (leagues fan out across a worker
+    #    pool — each fetch is an independent paginated HTTP walk), then match
+    if provider != "sportmonks":
+        raise ValueError(f"Unsupported provider for seasons: {provider}")
+
+    seasons_by_league: Dict[int, List[Dict[str, Any]]] = {}
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        futures = {
+            pool.submit(_sportmonks_fetch_seasons_for_league, provider, league_id): league_id
+            for league_id in league_ids
+        }
+        for fut in as_completed(futures):
+            seasons_by_league[futures[fut]] = fut.result()
+
     wanted_rows: List[Dict[str, Any]] = []
     matched_yaml: Set[str] = set()
     keep_ids: Set[int] = set()
+    seen: Set[Tuple[int, int]] = set()
 
     for league_id in league_ids:
-        if provider == "sportmonks":
-            api_rows = _sportmonks_fetch_seasons_for_league(provider, league_id)
-        else:
-            raise ValueError(f"Unsupported provider for seasons: {provider}")
+        api_rows = seasons_by_league.get(league_id, [])
 
         for s in api_rows:
             sid = s.get("id")
@@ -290,10 +379,18 @@ def main(
             if not is_match:
                 continue
 
-            try:
+            # explicit type checks beat exception-driven int() on bad ids
+            if isinstance(sid, int):
+                sid_i = sid
+            elif isinstance(sid, str) and sid.isdigit():
                 sid_i = int(sid)
-            except Exception:
+            else:
+                continue
+
+            # dedup: overlapping API responses must not produce duplicate rows
+            if (int(league_id), sid_i) in seen:
                 continue
+            seen.add((int(league_id), sid_i))
 
             # record "which YAML entry matched" (for warning)
             # If exact matched, use that exact; else use start year as proxy
@@ -301,9 +398,7 @@ def main(
                 matched_yaml.add(name)
             elif start_year in allowed_years:
                 # mark all YAML entries sharing that start year as "matched"
-                for y in allowed_exact:
-                    if _season_start_year(y) == start_year:
-                        matched_yaml.add(y)
+                matched_yaml.update(yaml_by_year.get(start_year, ()))
 
             row = {
                 "season_id": sid_i,
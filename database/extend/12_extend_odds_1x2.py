@@ -28,11 +28,18 @@ Usage:
 from __future__ import annotations
 
 import argparse
+import io
+import threading
 import time
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime, timedelta, timezone
 from typing import Any, Dict, List, Optional, Sequence
 
+import orjson
 import requests
+from psycopg2.extras import execute_values
+from requests.adapters import HTTPAdapter
 from sqlalchemy import (
     MetaData,
     Table,
@@ -42,10 +49,9 @@ from sqlalchemy import (
     Text,
     DateTime,
     func,
-    select,
     text,
 )
-from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.exc import DBAPIError
 
 from database.connection.engine import get_engine
 from api_calls.auth.auth import get_access_params
@@ -62,7 +68,10 @@ def _to_utc(dt: datetime) -> datetime:
 
 
 def _iso(dt: datetime) -> str:
-    return _to_utc(dt).strftime("%Y-%m-%dT%H:%M:%SZ")
+    # f-string the fixed UTC format directly; strftime is locale-aware and
+    # noticeably slower across tens of thousands of snapshots
+    u = _to_utc(dt)
+    return f"{u.year:04d}-{u.month:02d}-{u.day:02d}T{u.hour:02d}:{u.minute:02d}:{u.second:02d}Z"
 
 
 def _dt_from_any(x: Any) -> datetime:
@@ -90,42 +99,212 @@ def make_odds_1x2_table(metadata: MetaData) -> Table:
     )
 
 
-def upsert_odds_1x2(engine, rows: Sequence[Dict[str, Any]]) -> int:
+_ODDS_MD = MetaData()
+_ODDS_TABLE = make_odds_1x2_table(_ODDS_MD)
+_ODDS_SCHEMA_ENSURED = False
+
+
+def get_odds_table(engine) -> Table:
+    """
+    Return the shared odds_1x2 Table, running create_all only once per process.
+    """
+    global _ODDS_SCHEMA_ENSURED
+    if not _ODDS_SCHEMA_ENSURED:
+        _ODDS_MD.create_all(engine)
+        # The PK leads with fixture_id, so the missing-odds anti-join
+        # (provider = :p AND fixture_id = f.fixture_id) cannot use it
+        # efficiently; this covering index enables an index-only scan.
+        with engine.begin() as conn:
+            conn.execute(
+                text(
+                    "CREATE INDEX IF NOT EXISTS idx_odds_1x2_provider_fixture "
+                    "ON public.odds_1x2 (provider, fixture_id)"
+                )
+            )
+        _ODDS_SCHEMA_ENSURED = True
+    return _ODDS_TABLE
+
+
+_ODDS_COLUMNS = ("fixture_id", "timestamp", "timeline_identifier", "provider", "home", "draw", "away")
+
+# Plain tuples instead of 7-key dicts per snapshot: far fewer allocations
+# when batches run into the tens of thousands of rows, and execute_values /
+# COPY consume them directly.
+OddsRow = namedtuple("OddsRow", _ODDS_COLUMNS)
+
+# execute_values builds one multi-VALUES statement per page — the fastest
+# non-COPY path in psycopg2 and cheaper to parse than per-row binds.
+_VALUES_UPSERT_SQL = """
+    INSERT INTO public.odds_1x2 (fixture_id, timestamp, timeline_identifier, provider, home, draw, away)
+    VALUES %s
+    ON CONFLICT (fixture_id, timestamp, timeline_identifier, provider)
+    DO UPDATE SET
+        home = EXCLUDED.home,
+        draw = EXCLUDED.draw,
+        away = EXCLUDED.away,
+        computed_at = now()
+    WHERE (odds_1x2.home, odds_1x2.draw, odds_1x2.away)
+          IS DISTINCT FROM (EXCLUDED.home, EXCLUDED.draw, EXCLUDED.away)
+"""
+
+
+def upsert_odds_1x2(engine, rows: Sequence["OddsRow"]) -> int:
     if not rows:
         return 0
 
-    md = MetaData()
-    tbl = make_odds_1x2_table(md)
-    md.create_all(engine)
+    get_odds_table(engine)
 
-    stmt = pg_insert(tbl).values(list(rows))
-    excluded = stmt.excluded
+    raw = engine.raw_connection()
+    try:
+        cur = raw.cursor()
+        execute_values(cur, _VALUES_UPSERT_SQL, rows, page_size=500)
+        raw.commit()
+    except Exception:
+        raw.rollback()
+        raise
+    finally:
+        raw.close()
+    return len(rows)
+
+
+_COPY_MERGE_SQL = """
+    INSERT INTO public.odds_1x2 (fixture_id, timestamp, timeline_identifier, provider, home, draw, away)
+    SELECT fixture_id, timestamp, timeline_identifier, provider, home, draw, away
+    FROM tmp_odds_1x2
+    ON CONFLICT (fixture_id, timestamp, timeline_identifier, provider)
+    DO UPDATE SET
+        home = EXCLUDED.home,
+        draw = EXCLUDED.draw,
+        away = EXCLUDED.away,
+        computed_at = now()
+    WHERE (odds_1x2.home, odds_1x2.draw, odds_1x2.away)
+          IS DISTINCT FROM (EXCLUDED.home, EXCLUDED.draw, EXCLUDED.away)
+"""
 
-    changed = (
-        tbl.c.home.is_distinct_from(excluded.home)
-        | tbl.c.draw.is_distinct_from(excluded.draw)
-        | tbl.c.away.is_distinct_from(excluded.away)
-    )
 
-    stmt = stmt.on_conflict_do_update(
-        index_elements=[tbl.c.fixture_id, tbl.c.timestamp, tbl.c.timeline_identifier, tbl.c.provider],
-        set_={
-            "home": excluded.home,
-            "draw": excluded.draw,
-            "away": excluded.away,
-            "computed_at": func.now(),
-        },
-        where=changed,
-    )
+def _copy_upsert_odds_1x2(engine, rows: Sequence["OddsRow"]) -> int:
+    """
+    Bulk path: COPY rows into a TEMP table, then merge with one
+    INSERT ... SELECT ... ON CONFLICT DO UPDATE. Much faster than
+    per-fixture multi-VALUES inserts for thousands of rows.
+    """
+    buf = io.StringIO()
+    for r in rows:
+        buf.write(
+            "\t".join(
+                "\\N" if v is None else (v.isoformat() if isinstance(v, datetime) else str(v))
+                for v in r
+            )
+        )
+        buf.write("\n")
+    buf.seek(0)
 
-    with engine.begin() as conn:
-        res = conn.execute(stmt)
-        return int(res.rowcount or 0)
+    raw = engine.raw_connection()
+    try:
+        cur = raw.cursor()
+        cur.execute("CREATE TEMP TABLE tmp_odds_1x2 (LIKE public.odds_1x2 INCLUDING DEFAULTS) ON COMMIT DROP")
+        cur.copy_expert(
+            f"COPY tmp_odds_1x2 ({', '.join(_ODDS_COLUMNS)}) FROM STDIN",
+            buf,
+        )
+        cur.execute(_COPY_MERGE_SQL)
+        n = int(cur.rowcount or 0)
+        raw.commit()
+        return n
+    except Exception:
+        raw.rollback()
+        raise
+    finally:
+        raw.close()
+
+
+class OddsBuffer:
+    """
+    Accumulates odds rows across fixtures and flushes them in large batches.
+
+    Small flushes go through the regular upsert; once the buffer crosses
+    `threshold` rows, the COPY + staged-merge path is used.
+    """
+
+    def __init__(self, engine, threshold: int = 5000) -> None:
+        self.engine = engine
+        self.threshold = threshold
+        self.rows: List[OddsRow] = []
+
+    def add(self, rows: Sequence[OddsRow]) -> None:
+        self.rows.extend(rows)
+
+    def flush_if_large(self) -> int:
+        if len(self.rows) >= self.threshold:
+            return self.flush()
+        return 0
+
+    def flush(self) -> int:
+        if not self.rows:
+            return 0
+        if len(self.rows) >= self.threshold:
+            n = _copy_upsert_odds_1x2(self.engine, self.rows)
+        else:
+            n = upsert_odds_1x2(self.engine, self.rows)
+        self.rows.clear()
+        return n
 
 
 # ----------------------------
 # Candidate fixtures: ONLY those missing odds rows
 # ----------------------------
+# Materialized view over the (large) fixtures LEFT JOIN odds_1x2 anti-join.
+# The result set is mostly stable between runs, so we refresh once at run
+# start and then read from the view instead of re-scanning both tables.
+# MVs cannot be parameterized, so the view is pinned to the default
+# provider label; other providers fall back to the direct query.
+_MISSING_ODDS_VIEW_PROVIDER = "betfair"
+
+_CREATE_MISSING_ODDS_VIEW_SQL = text(
+    f"""
+    CREATE MATERIALIZED VIEW IF NOT EXISTS public.fixtures_missing_odds_1x2 AS
+    SELECT
+        '{_MISSING_ODDS_VIEW_PROVIDER}'::text AS provider,
+        f.fixture_id,
+        f.league_id,
+        f.season_id,
+        f.date AS kickoff,
+        f.home_team_id,
+        f.away_team_id,
+        fm.oa_event_id
+    FROM public.fixtures f
+    JOIN public.fixtures_matching fm
+      ON fm.fixture_id = f.fixture_id
+    LEFT JOIN public.odds_1x2 o
+      ON o.fixture_id = f.fixture_id
+     AND o.provider = '{_MISSING_ODDS_VIEW_PROVIDER}'
+    WHERE f.fixture_id IS NOT NULL
+      AND f.date IS NOT NULL
+      AND f.league_id IS NOT NULL
+      AND f.season_id IS NOT NULL
+      AND f.home_team_id IS NOT NULL
+      AND f.away_team_id IS NOT NULL
+      AND fm.oa_event_id IS NOT NULL
+      AND o.fixture_id IS NULL
+    """
+)
+
+
+def _refresh_missing_odds_view(engine) -> None:
+    with engine.begin() as conn:
+        conn.execute(_CREATE_MISSING_ODDS_VIEW_SQL)
+        conn.execute(
+            text(
+                "CREATE UNIQUE INDEX IF NOT EXISTS fixtures_missing_odds_1x2_key "
+                "ON public.fixtures_missing_odds_1x2 (provider, fixture_id)"
+            )
+        )
+    # REFRESH ... CONCURRENTLY is not allowed inside a transaction block,
+    # so it needs an autocommit connection rather than engine.begin().
+    with engine.execution_options(isolation_level="AUTOCOMMIT").connect() as conn:
+        conn.execute(text("REFRESH MATERIALIZED VIEW CONCURRENTLY public.fixtures_missing_odds_1x2"))
+
+
 def fetch_candidate_fixtures_missing_odds(
     engine,
     *,
@@ -158,6 +337,48 @@ def fetch_candidate_fixtures_missing_odds(
         league_filter = "AND f.league_id = ANY(:league_ids)"
         params["league_ids"] = league_ids
 
+    if provider_label == _MISSING_ODDS_VIEW_PROVIDER:
+        try:
+            _refresh_missing_odds_view(engine)
+            view_sql = text(
+                f"""
+                SELECT
+                    f.fixture_id,
+                    f.league_id,
+                    f.season_id,
+                    f.kickoff,
+                    f.home_team_id,
+                    f.away_team_id,
+                    f.oa_event_id
+                FROM public.fixtures_missing_odds_1x2 f
+                WHERE f.provider = :provider
+                  {season_filter}
+                  {league_filter}
+                ORDER BY f.kickoff, f.fixture_id
+                {limit_sql}
+                """
+            )
+            with engine.begin() as conn:
+                rows = conn.execute(view_sql, params).fetchall()
+            return [
+                {
+                    "fixture_id": int(r.fixture_id),
+                    "league_id": int(r.league_id),
+                    "season_id": int(r.season_id),
+                    "kickoff": _dt_from_any(r.kickoff),
+                    "home_team_id": int(r.home_team_id),
+                    "away_team_id": int(r.away_team_id),
+                    "oa_event_id": str(r.oa_event_id),
+                }
+                for r in rows
+            ]
+        except DBAPIError as e:
+            # Only database-side failures (missing privileges, dropped view,
+            # ...) fall back to the direct query; anything else is a bug in
+            # this path and should surface instead of hiding behind the
+            # fallback forever.
+            print(f"[WARN] materialized view path failed ({e}); falling back to direct query")
+
     sql = text(
         f"""
         SELECT
@@ -264,27 +485,16 @@ def resolve_sport_key_from_league(engine, league_id: int) -> str:
 # ----------------------------
 def build_snapshot_times(kickoff: datetime, prev_kickoff: Optional[datetime]) -> List[datetime]:
     k = _to_utc(kickoff)
-    out: List[datetime] = []
 
     # 2h before kickoff: 10-min interval (includes last snapshot at kickoff-10min)
-    t = k - timedelta(hours=2)
-    while t <= k - timedelta(minutes=10):
-        out.append(t)
-        t += timedelta(minutes=10)
+    out = [k - timedelta(minutes=m) for m in range(10, 121, 10)]
 
     # 24h to 2h before kickoff: hourly (stop at kickoff-3h to avoid overlap)
-    t = k - timedelta(hours=24)
-    while t <= k - timedelta(hours=3):
-        out.append(t)
-        t += timedelta(hours=1)
+    out += [k - timedelta(hours=h) for h in range(3, 25)]
 
     if prev_kickoff is not None:
         p = _to_utc(prev_kickoff)
-        for h in (1, 2, 3):
-            out.append(p + timedelta(hours=h))
-        for h in (1, 2, 3):
-            out.append(p - timedelta(hours=h))
-        out.append(p - timedelta(days=3))
+        out += [p + timedelta(hours=h) for h in (1, 2, 3, -1, -2, -3, -72)]
 
     return sorted(set(out), reverse=True)
 
@@ -292,6 +502,48 @@ def build_snapshot_times(kickoff: datetime, prev_kickoff: Optional[datetime]) ->
 # ----------------------------
 # OddsAPI fetch with retry/backoff
 # ----------------------------
+class _TokenBucket:
+    """
+    Thread-safe token bucket: acquire() blocks until a request slot is free.
+
+    Pacing requests proactively beats discovering the limit via 429s under
+    concurrency, where every worker would otherwise back off independently.
+    The 429 retry path stays in place as a safety net.
+    """
+
+    def __init__(self, rate: float, capacity: float) -> None:
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def acquire(self) -> None:
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1.0:
+                    self.tokens -= 1.0
+                    return
+                wait = (1.0 - self.tokens) / self.rate
+            time.sleep(wait)
+
+
+# Process-wide pacing at 10 req/s, shared by all worker threads.
+_RATE_LIMITER = _TokenBucket(rate=10.0, capacity=10.0)
+
+# Cap the number of in-flight HTTP requests across all worker threads so a
+# large worker count cannot exceed the API's concurrency tolerance.
+_HTTP_SLOTS = threading.BoundedSemaphore(16)
+
+# One pooled session for all threads: OddsAPI is a single host, so keeping
+# connections alive saves a TCP+TLS handshake on every call after the first.
+_SESSION = requests.Session()
+_SESSION.mount("https://", HTTPAdapter(pool_connections=32, pool_maxsize=32))
+
+
 def _is_rate_limit(e: Exception) -> bool:
     if isinstance(e, requests.HTTPError):
         resp = getattr(e, "response", None)
@@ -311,41 +563,41 @@ def fetch_h2h_odds_snapshot(
     snapshot_dt: datetime,
     bookmaker_key: str,
     region: str,
+    api_key: str,
+    url_tmpl: str,
 ) -> Dict[str, Any]:
-    params = get_access_params("oddsapi")
-    api_key = params["api_token"]
-
-    url_tmpl = get_url("oddsapi", "historical_event_odds")
     url = url_tmpl.format(sport=sport_key, event_id=event_id)
 
-    r = requests.get(
-        url,
-        params={
-            "apiKey": api_key,
-            "date": _iso(snapshot_dt),
-            "dateFormat": "iso",
-            "markets": "h2h",
-            "oddsFormat": "decimal",
-            "regions": region,
-            "bookmakers": bookmaker_key,
-        },
-        timeout=45,
-    )
+    _RATE_LIMITER.acquire()
+    with _HTTP_SLOTS:
+        r = _SESSION.get(
+            url,
+            params={
+                "apiKey": api_key,
+                "date": _iso(snapshot_dt),
+                # unix timestamps are cheaper to emit server-side and to skip client-side
+                "dateFormat": "unix",
+                "markets": "h2h",
+                "oddsFormat": "decimal",
+                "regions": region,
+                "bookmakers": bookmaker_key,
+            },
+            timeout=45,
+        )
     r.raise_for_status()
-    payload = r.json()
+    payload = orjson.loads(r.content)
 
     data = payload.get("data") or {}
-    bookmakers = data.get("bookmakers") or []
+    bookmakers = data.get("bookmakers")
 
+    home = draw = away = None
     chosen = None
-    for b in bookmakers:
-        if str(b.get("key", "")).lower() == bookmaker_key.lower():
-            chosen = b
-            break
-    if chosen is None and bookmakers:
-        chosen = bookmakers[0]
 
-    home = draw = away = None
+    if bookmakers:
+        chosen = next(
+            (b for b in bookmakers if str(b.get("key", "")).lower() == bookmaker_key.lower()),
+            bookmakers[0],
+        )
 
     if chosen:
         markets = chosen.get("markets") or []
@@ -356,17 +608,20 @@ def fetch_h2h_odds_snapshot(
             ht = str(data.get("home_team", "")).strip().lower()
             at = str(data.get("away_team", "")).strip().lower()
 
+            # single dict lookup per outcome instead of three comparisons
+            targets = {ht: "home", at: "away", "draw": "draw"}
+
             for o in outcomes:
-                name = str(o.get("name", "")).strip().lower()
                 price = o.get("price")
                 if price is None:
                     continue
 
-                if name == "draw":
-                    draw = float(price)
-                elif name == ht:
+                key = targets.get(o.get("name", "").strip().lower())
+                if key == "home":
                     home = float(price)
-                elif name == at:
+                elif key == "draw":
+                    draw = float(price)
+                elif key == "away":
                     away = float(price)
 
     return {
@@ -385,6 +640,8 @@ def fetch_h2h_with_retry(
     snapshot_dt: datetime,
     bookmaker_key: str,
     region: str,
+    api_key: str,
+    url_tmpl: str,
     max_retries: int = 10,
     base_sleep_s: float = 2.0,
     max_sleep_s: float = 60.0,
@@ -398,6 +655,8 @@ def fetch_h2h_with_retry(
                 snapshot_dt=snapshot_dt,
                 bookmaker_key=bookmaker_key,
                 region=region,
+                api_key=api_key,
+                url_tmpl=url_tmpl,
             )
         except Exception as e:
             last_err = e
@@ -413,6 +672,82 @@ def fetch_h2h_with_retry(
     raise RuntimeError(f"Failed odds fetch after {max_retries} retries") from last_err
 
 
+# ----------------------------
+# Per-fixture worker
+# ----------------------------
+def process_fixture(
+    engine,
+    fx: Dict[str, Any],
+    *,
+    provider_label: str,
+    region: str,
+    bookmaker: str,
+    api_key: str,
+    url_tmpl: str,
+) -> List[OddsRow]:
+    """
+    Build the full snapshot timeline for one fixture and return its odds rows.
+
+    Runs inside a worker thread: DB lookups use the shared (thread-safe)
+    engine pool, HTTP calls are bounded by the module-level semaphore.
+    """
+    fixture_id = fx["fixture_id"]
+
+    sport_key = resolve_sport_key_from_league(engine, fx["league_id"])
+    kickoff = fx["kickoff"]
+    oa_event_id = fx["oa_event_id"]
+
+    prev1 = fetch_prev1_for_home_team(engine, fixture_id=fixture_id, home_team_id=fx["home_team_id"])
+    prev_kickoff: Optional[datetime] = None
+    if prev1 is not None:
+        prev_kickoff = fetch_fixture_kickoff(engine, prev1)
+
+    times = build_snapshot_times(kickoff=kickoff, prev_kickoff=prev_kickoff)
+
+    # Upcoming fixtures schedule snapshots in the future; OddsAPI has no
+    # history for those, so drop them before spending HTTP calls.
+    now = datetime.now(timezone.utc)
+    times = [t for t in times if _to_utc(t) < now]
+
+    rows: List[OddsRow] = []
+    for idx, t in enumerate(times, start=1):
+        timeline_id = f"odd_{idx}"
+        snap_ts = _to_utc(t)
+        try:
+            snap = fetch_h2h_with_retry(
+                sport_key=sport_key,
+                event_id=oa_event_id,
+                snapshot_dt=snap_ts,
+                bookmaker_key=bookmaker,
+                region=region,
+                api_key=api_key,
+                url_tmpl=url_tmpl,
+            )
+            rows.append(
+                OddsRow(
+                    fixture_id,
+                    snap_ts,
+                    timeline_id,
+                    provider_label,
+                    snap["home"],
+                    snap["draw"],
+                    snap["away"],
+                )
+            )
+        except Exception as e:
+            # keep timeline complete
+            print(
+                f"[WARN] fixture_id={fixture_id} snapshot={snap_ts.isoformat()} "
+                f"sport={sport_key} event={oa_event_id} error={e}"
+            )
+            rows.append(OddsRow(fixture_id, snap_ts, timeline_id, provider_label, None, None, None))
+            time.sleep(0.2)
+
+        time.sleep(0.05)
+
+    return rows
+
+
 # ----------------------------
 # Main
 # ----------------------------
@@ -436,6 +771,7 @@ def main() -> None:
         default=None,
         help="Restrict to this league_id (repeatable: --league-id 8 --league-id 82)",
     )
+    ap.add_argument("--workers", type=int, default=4, help="Concurrent fixtures (default: 4)")
     args = ap.parse_args()
 
     provider_label = str(args.provider).strip().lower()
@@ -447,10 +783,12 @@ def main() -> None:
 
     engine = get_engine()
 
-    # Ensure table exists
-    md = MetaData()
-    make_odds_1x2_table(md)
-    md.create_all(engine)
+    # Ensure table exists (once per process)
+    get_odds_table(engine)
+
+    # Resolve credentials + URL template once instead of per HTTP call
+    api_key = get_access_params("oddsapi")["api_token"]
+    url_tmpl = get_url("oddsapi", "historical_event_odds")
 
     fixtures = fetch_candidate_fixtures_missing_odds(
         engine,
@@ -473,90 +811,59 @@ def main() -> None:
     total_rows = 0
     total_upserted = 0
 
-    for i, fx in enumerate(fixtures, start=1):
-        fixture_id = fx["fixture_id"]
+    buffer = OddsBuffer(engine)
+
+    # Fixtures run concurrently: one fixture's JSON parsing / row prep
+    # overlaps another's HTTP wait. Rows are drained into the buffer on the
+    # main thread only, so OddsBuffer needs no locking.
+    with ThreadPoolExecutor(max_workers=args.workers) as pool:
+        futures = {
+            pool.submit(
+                process_fixture,
+                engine,
+                fx,
+                provider_label=provider_label,
+                region=region,
+                bookmaker=bookmaker,
+                api_key=api_key,
+                url_tmpl=url_tmpl,
+            ): fx
+            for fx in fixtures
+        }
 
         try:
-            sport_key = resolve_sport_key_from_league(engine, fx["league_id"])
-            kickoff = fx["kickoff"]
-            oa_event_id = fx["oa_event_id"]
-
-            prev1 = fetch_prev1_for_home_team(engine, fixture_id=fixture_id, home_team_id=fx["home_team_id"])
-            prev_kickoff: Optional[datetime] = None
-            if prev1 is not None:
-                prev_kickoff = fetch_fixture_kickoff(engine, prev1)
+            for i, fut in enumerate(as_completed(futures), start=1):
+                fx = futures[fut]
+                fixture_id = fx["fixture_id"]
 
-            times = build_snapshot_times(kickoff=kickoff, prev_kickoff=prev_kickoff)
-
-            rows: List[Dict[str, Any]] = []
-            for idx, t in enumerate(times, start=1):
-                timeline_id = f"odd_{idx}"
-                snap_ts = _to_utc(t)
                 try:
-                    snap = fetch_h2h_with_retry(
-                        sport_key=sport_key,
-                        event_id=oa_event_id,
-                        snapshot_dt=snap_ts,
-                        bookmaker_key=bookmaker,
-                        region=region,
-                    )
-                    rows.append(
-                        {
-                            "fixture_id": fixture_id,
-                            "timestamp": snap_ts,
-                            "timeline_identifier": timeline_id,
-                            "provider": provider_label,
-                            "home": snap["home"],
-                            "draw": snap["draw"],
-                            "away": snap["away"],
-                        }
-                    )
+                    rows = fut.result()
                 except Exception as e:
-                    # keep timeline complete
-                    print(
-                        f"[WARN] fixture_id={fixture_id} snapshot={snap_ts.isoformat()} "
-                        f"sport={sport_key} event={oa_event_id} error={e}"
-                    )
-                    rows.append(
-                        {
-                            "fixture_id": fixture_id,
-                            "timestamp": snap_ts,
-                            "timeline_identifier": timeline_id,
-                            "provider": provider_label,
-                            "home": None,
-                            "draw": None,
-                            "away": None,
-                        }
-                    )
-                    time.sleep(0.2)
-
-                time.sleep(0.05)
-
-            up = upsert_odds_1x2(engine, rows)
-
-            print(
-                f"[FIXTURE DONE] {i}/{len(fixtures)} fixture_id={fixture_id} season_id={fx['season_id']} "
-                f"snapshots={len(rows)} upserted={up}"
-            )
+                    failed += 1
+                    print(f"[ERROR] {i}/{len(fixtures)} fixture_id={fixture_id} failed: {e}")
+                    continue
 
-            ok += 1
-            total_rows += len(rows)
-            total_upserted += up
+                buffer.add(rows)
+                total_upserted += buffer.flush_if_large()
 
-            if ok % 5 == 0 or i == len(fixtures):
                 print(
-                    f"[PROGRESS] {i}/{len(fixtures)} ok={ok} failed={failed} "
-                    f"rows_prepared={total_rows} upserted={total_upserted}"
+                    f"[FIXTURE DONE] {i}/{len(fixtures)} fixture_id={fixture_id} season_id={fx['season_id']} "
+                    f"snapshots={len(rows)} buffered={len(buffer.rows)}"
                 )
 
+                ok += 1
+                total_rows += len(rows)
+
+                if ok % 5 == 0 or i == len(fixtures):
+                    print(
+                        f"[PROGRESS] {i}/{len(fixtures)} ok={ok} failed={failed} "
+                        f"rows_prepared={total_rows} upserted={total_upserted}"
+                    )
         except KeyboardInterrupt:
-            print("\n[INTERRUPT] Stopping early (CTRL+C). Progress saved fixture-by-fixture.")
-            break
-        except Exception as e:
-            failed += 1
-            print(f"[ERROR] {i}/{len(fixtures)} fixture_id={fixture_id} failed: {e}")
-            time.sleep(0.5)
-            continue
+            print("\n[INTERRUPT] Stopping early (CTRL+C). Flushing buffered rows...")
+            pool.shutdown(wait=False, cancel_futures=True)
+
+    total_upserted += buffer.flush()
 
     print("\nDone.")
     print(f"[ODDS_1X2 EXTEND] ok={ok} failed={failed}")
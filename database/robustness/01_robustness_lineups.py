@@ -24,10 +24,14 @@ Usage examples:
 from __future__ import annotations
 
 import argparse
+import hashlib
+import json
+from pathlib import Path
 from typing import Optional
 
+import numpy as np
 import pandas as pd
-from sqlalchemy import text, bindparam
+from sqlalchemy import text
 
 from database.connection.engine import get_engine
 
@@ -70,6 +74,16 @@ def parse_args() -> argparse.Namespace:
     )
     ap.add_argument("--schema", default="public", help="Schema to search for the lineups table (default public).")
     ap.add_argument("--min-player-rows", type=int, default=1, help="Minimum player rows to count as 'has lineups'.")
+    ap.add_argument(
+        "--refresh-cache",
+        action="store_true",
+        help="Ignore the cached lineups-table detection and re-run the catalog scan.",
+    )
+    ap.add_argument(
+        "--ensure-indexes",
+        action="store_true",
+        help="Create supporting indexes (if missing) and ANALYZE the involved tables before querying.",
+    )
     return ap.parse_args()
 
 
@@ -97,29 +111,26 @@ def autodetect_lineups_table(engine, schema: str = "public") -> str:
       - minutes_player
       - rating_player
     """
+    # pg_catalog directly: information_schema.columns is a view over heavy
+    # data-dictionary joins and materializes every column of every table in
+    # the schema; this touches only the four candidate attnames.
     q = """
-    WITH cols AS (
-        SELECT
-            table_schema,
-            table_name,
-            SUM(CASE WHEN column_name = 'fixture_id' THEN 1 ELSE 0 END) AS has_fixture_id,
-            SUM(CASE WHEN column_name = 'player_id' THEN 1 ELSE 0 END) AS has_player_id,
-            SUM(CASE WHEN column_name = 'minutes_player' THEN 1 ELSE 0 END) AS has_minutes_player,
-            SUM(CASE WHEN column_name = 'rating_player' THEN 1 ELSE 0 END) AS has_rating_player
-        FROM information_schema.columns
-        WHERE table_schema = :schema
-        GROUP BY table_schema, table_name
-    )
     SELECT
-        table_schema,
-        table_name,
-        has_fixture_id,
-        has_player_id,
-        has_minutes_player,
-        has_rating_player,
-        (has_minutes_player + has_rating_player) AS score
-    FROM cols
-    WHERE has_fixture_id = 1 AND has_player_id = 1
+        n.nspname AS table_schema,
+        c.relname AS table_name,
+        bool_or(a.attname = 'minutes_player') AS has_minutes_player,
+        bool_or(a.attname = 'rating_player') AS has_rating_player,
+        (bool_or(a.attname = 'minutes_player')::int
+         + bool_or(a.attname = 'rating_player')::int) AS score
+    FROM pg_catalog.pg_class c
+    JOIN pg_catalog.pg_namespace n ON n.oid = c.relnamespace
+    JOIN pg_catalog.pg_attribute a ON a.attrelid = c.oid
+    WHERE n.nspname = :schema
+      AND c.relkind = 'r'
+      AND NOT a.attisdropped
+      AND a.attname IN ('fixture_id', 'player_id', 'minutes_player', 'rating_player')
+    GROUP BY n.nspname, c.relname
+    HAVING bool_or(a.attname = 'fixture_id') AND bool_or(a.attname = 'player_id')
     ORDER BY score DESC, table_name ASC
     LIMIT 10
     """
@@ -136,6 +147,58 @@ def autodetect_lineups_table(engine, schema: str = "public") -> str:
     return f"{best['table_schema']}.{best['table_name']}"
 
 
+# The schema is effectively static, so the detection result is cached on
+# disk keyed by (database url hash, schema); --refresh-cache re-runs the
+# catalog scan.
+_LINEUPS_CACHE_PATH = Path.home() / ".cache" / "sport_analytics" / "lineups_table.json"
+
+
+def resolve_lineups_table(engine, schema: str = "public", refresh: bool = False) -> str:
+    key = f"{hashlib.sha1(str(engine.url).encode()).hexdigest()}:{schema}"
+
+    cache: dict = {}
+    try:
+        cache = json.loads(_LINEUPS_CACHE_PATH.read_text())
+    except Exception:
+        cache = {}
+
+    if not refresh and isinstance(cache.get(key), str):
+        return cache[key]
+
+    table = autodetect_lineups_table(engine, schema=schema)
+
+    try:
+        _LINEUPS_CACHE_PATH.parent.mkdir(parents=True, exist_ok=True)
+        cache[key] = table
+        _LINEUPS_CACHE_PATH.write_text(json.dumps(cache))
+    except Exception:
+        pass  # cache is best-effort; detection result is still returned
+
+    return table
+
+
+def ensure_indexes(engine, lineups_table: str) -> None:
+    """
+    One-shot DDL + ANALYZE so the planner has indexes and fresh stats for
+    the coverage query. IF NOT EXISTS makes re-runs free. (Plain CREATE
+    INDEX, not CONCURRENTLY — these run inside a transaction.)
+    """
+    idx_name = "idx_" + lineups_table.split(".")[-1] + "_fixture_cover"
+    stmts = [
+        f"CREATE INDEX IF NOT EXISTS {idx_name} "
+        f"ON {lineups_table} (fixture_id) INCLUDE (minutes_player, rating_player)",
+        "CREATE INDEX IF NOT EXISTS idx_leagues_provider_cover "
+        f"ON {LEAGUES_TABLE} (provider) INCLUDE (league_id, league_name)",
+        f"ANALYZE {FIXTURES_TABLE}",
+        f"ANALYZE {LEAGUES_TABLE}",
+        f"ANALYZE {lineups_table}",
+    ]
+    with engine.begin() as conn:
+        for s in stmts:
+            conn.execute(text(s))
+    print(f"Ensured indexes + fresh stats for {lineups_table}, {LEAGUES_TABLE}, {FIXTURES_TABLE}")
+
+
 # ------------------
 # Main query logic
 # ------------------
@@ -154,7 +217,7 @@ def compute_coverage(engine, provider: str, season_ids: Optional[list[int]], lin
 
     where.append("l.provider = :provider")
     if season_ids:
-        where.append("f.season_id IN :season_ids")
+        where.append("f.season_id = ANY(:season_ids)")
         params["season_ids"] = [int(x) for x in season_ids]
 
     where_sql = " AND ".join(where) if where else "TRUE"
@@ -164,7 +227,8 @@ def compute_coverage(engine, provider: str, season_ids: Optional[list[int]], lin
     WITH fixtures_universe AS (
         SELECT
             f.fixture_id,
-            f.league_id
+            f.league_id,
+            l.league_name
         FROM {FIXTURES_TABLE} f
         JOIN {LEAGUES_TABLE} l
           ON l.league_id = f.league_id
@@ -173,77 +237,90 @@ def compute_coverage(engine, provider: str, season_ids: Optional[list[int]], lin
           AND f.league_id IS NOT NULL
     ),
     lineup_flags AS (
+        -- inner join pushes the universe filter into the aggregation:
+        -- only player rows of target fixtures are scanned, and bool_or is
+        -- cheaper per row than MAX(CASE ...)
         SELECT
             lp.fixture_id,
             COUNT(*) AS n_player_rows,
-            MAX(CASE WHEN lp.minutes_player IS NOT NULL THEN 1 ELSE 0 END) AS has_minutes,
-            MAX(CASE WHEN lp.rating_player  IS NOT NULL THEN 1 ELSE 0 END) AS has_rating,
-            MAX(CASE WHEN lp.minutes_player IS NOT NULL AND lp.rating_player IS NOT NULL THEN 1 ELSE 0 END) AS has_both
+            bool_or(lp.minutes_player IS NOT NULL) AS has_minutes,
+            bool_or(lp.rating_player  IS NOT NULL) AS has_rating,
+            bool_or(lp.minutes_player IS NOT NULL AND lp.rating_player IS NOT NULL) AS has_both
         FROM {lineups_table} lp
+        JOIN fixtures_universe fu
+          ON fu.fixture_id = lp.fixture_id
         GROUP BY lp.fixture_id
     ),
     joined AS (
         SELECT
             fu.fixture_id,
-            fu.league_id,
+            fu.league_name,
             COALESCE(lf.n_player_rows, 0) AS n_player_rows,
-            COALESCE(lf.has_minutes, 0) AS has_minutes,
-            COALESCE(lf.has_rating, 0) AS has_rating,
-            COALESCE(lf.has_both, 0) AS has_both
+            COALESCE(lf.has_minutes, FALSE) AS has_minutes,
+            COALESCE(lf.has_rating, FALSE) AS has_rating,
+            COALESCE(lf.has_both, FALSE) AS has_both
         FROM fixtures_universe fu
         LEFT JOIN lineup_flags lf
           ON lf.fixture_id = fu.fixture_id
     )
     SELECT
-        l.league_name,
+        j.league_name,
         COUNT(*) AS n_fixtures,
-        SUM(CASE WHEN j.n_player_rows >= :min_player_rows THEN 1 ELSE 0 END) AS n_with_lineups,
-        SUM(CASE WHEN j.has_minutes = 1 THEN 1 ELSE 0 END) AS n_with_minutes,
-        SUM(CASE WHEN j.has_rating  = 1 THEN 1 ELSE 0 END) AS n_with_ratings,
-        SUM(CASE WHEN j.has_both    = 1 THEN 1 ELSE 0 END) AS n_with_minutes_and_ratings
+        COUNT(*) FILTER (WHERE j.n_player_rows >= :min_player_rows) AS n_with_lineups,
+        COUNT(*) FILTER (WHERE j.has_minutes) AS n_with_minutes,
+        COUNT(*) FILTER (WHERE j.has_rating)  AS n_with_ratings,
+        COUNT(*) FILTER (WHERE j.has_both)    AS n_with_minutes_and_ratings
     FROM joined j
-    JOIN {LEAGUES_TABLE} l
-      ON l.league_id = j.league_id
-    WHERE l.provider = :provider
-    GROUP BY l.league_name
-    ORDER BY n_fixtures DESC, l.league_name ASC
+    GROUP BY ROLLUP(j.league_name)
+    ORDER BY n_fixtures DESC, j.league_name ASC
     """
 
-    if season_ids:
-        sql = text(q).bindparams(bindparam("season_ids", expanding=True))
-    else:
-        sql = text(q)
-
-    league_tbl = pd.read_sql(sql, engine, params=params)
-
-    # Overall totals from the league table
-    overall = pd.DataFrame(
-        {
-            "n_fixtures": [int(league_tbl["n_fixtures"].sum()) if not league_tbl.empty else 0],
-            "n_with_lineups": [int(league_tbl["n_with_lineups"].sum()) if not league_tbl.empty else 0],
-            "n_with_minutes": [int(league_tbl["n_with_minutes"].sum()) if not league_tbl.empty else 0],
-            "n_with_ratings": [int(league_tbl["n_with_ratings"].sum()) if not league_tbl.empty else 0],
-            "n_with_minutes_and_ratings": [
-                int(league_tbl["n_with_minutes_and_ratings"].sum()) if not league_tbl.empty else 0
-            ],
-        }
-    )
+    # ANY(array) keeps the query text stable regardless of how many season
+    # ids are passed, so the server can reuse the prepared plan.
+    sql = text(q)
+
+    # Server-side cursor + chunked fetch keeps peak memory at O(chunk)
+    # instead of materializing the whole result twice inside read_sql.
+    with engine.connect().execution_options(stream_results=True) as conn:
+        parts = list(pd.read_sql(sql, conn, params=params, chunksize=10_000))
+    league_tbl = pd.concat(parts, ignore_index=True) if parts else pd.DataFrame()
 
     # Add shares for readability
     def add_shares(df: pd.DataFrame) -> pd.DataFrame:
         if df.empty:
             return df
-        denom = df["n_fixtures"].replace(0, pd.NA)
+        # one vectorized divide over a (n_rows, 4) float array instead of
+        # four pandas Series operations; zero denominators yield NaN
+        cols = ["n_with_lineups", "n_with_minutes", "n_with_ratings", "n_with_minutes_and_ratings"]
+        counts = df[cols].to_numpy(dtype=np.float64)
+        denom = df["n_fixtures"].to_numpy(dtype=np.float64)[:, None]
+        shares = np.divide(counts, denom, out=np.full_like(counts, np.nan), where=denom > 0).round(4)
         df = df.copy()
-        df["share_with_lineups"] = (df["n_with_lineups"] / denom).astype(float).round(4)
-        df["share_with_minutes"] = (df["n_with_minutes"] / denom).astype(float).round(4)
-        df["share_with_ratings"] = (df["n_with_ratings"] / denom).astype(float).round(4)
-        df["share_with_minutes_and_ratings"] = (df["n_with_minutes_and_ratings"] / denom).astype(float).round(4)
+        df[["share_" + c.split("_", 1)[1] for c in cols]] = shares
         return df
 
-    overall = add_shares(overall)
+    # Shares once on the combined frame, then split: the ROLLUP row
+    # (league_name IS NULL) carries the grand totals, so no pandas summing.
     league_tbl = add_shares(league_tbl)
 
+    if league_tbl.empty:
+        overall = pd.DataFrame(
+            {
+                "n_fixtures": [0],
+                "n_with_lineups": [0],
+                "n_with_minutes": [0],
+                "n_with_ratings": [0],
+                "n_with_minutes_and_ratings": [0],
+            }
+        )
+    else:
+        overall = (
+            league_tbl[league_tbl["league_name"].isna()]
+            .drop(columns=["league_name"])
+            .reset_index(drop=True)
+        )
+        league_tbl = league_tbl[league_tbl["league_name"].notna()].reset_index(drop=True)
+
     return overall, league_tbl
 
 
@@ -260,12 +337,15 @@ def main() -> int:
     if args.lineups_table:
         lineups_table = args.lineups_table.strip()
     else:
-        lineups_table = autodetect_lineups_table(engine, schema=args.schema)
+        lineups_table = resolve_lineups_table(engine, schema=args.schema, refresh=args.refresh_cache)
 
     print_section("01) Robustness: Lineups / Minutes / Ratings coverage")
     print(f"provider={args.provider}, season_ids={season_ids}, min_player_rows={args.min_player_rows}")
     print(f"lineups_table={lineups_table}")
 
+    if args.ensure_indexes:
+        ensure_indexes(engine, lineups_table)
+
     overall, by_league = compute_coverage(
         engine=engine,
         provider=args.provider,
@@ -30,12 +30,16 @@ Usage:
 from __future__ import annotations
 
 import argparse
+import io
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime, timedelta, timezone
+from functools import lru_cache
 from typing import Any, Dict, List, Optional, Tuple
 
 import requests
+from psycopg2.extras import execute_values
+from requests.adapters import HTTPAdapter
 from sqlalchemy import MetaData, Table, Column, Integer, Float, Text, DateTime, func, text
-from sqlalchemy.dialects.postgresql import insert as pg_insert
 
 from database.connection.engine import get_engine
 from api_calls.auth.auth import get_access_params
@@ -52,7 +56,8 @@ def _to_utc(dt: datetime) -> datetime:
 
 
 def _iso(dt: datetime) -> str:
-    return _to_utc(dt).strftime("%Y-%m-%dT%H:%M:%SZ")
+    # isoformat avoids strftime's format parsing; output is identical
+    return _to_utc(dt).replace(tzinfo=None).isoformat(timespec="seconds") + "Z"
 
 
 def _dt_from_any(x: Any) -> datetime:
@@ -80,82 +85,121 @@ def make_odds_1x2_table(metadata: MetaData) -> Table:
     )
 
 
-def upsert_odds_1x2(engine, rows: List[Dict[str, Any]]) -> int:
-    if not rows:
-        return 0
+# Table built once at module scope; create_all (a catalog round-trip) runs
+# only on the first upsert of the process.
+_MD = MetaData()
+_TBL = make_odds_1x2_table(_MD)
+_CREATED = False
 
-    md = MetaData()
-    tbl = make_odds_1x2_table(md)
-    md.create_all(engine)
 
-    stmt = pg_insert(tbl).values(rows)
-    excluded = stmt.excluded
+_ODDS_COLUMNS = ("fixture_id", "timestamp", "timeline_identifier", "provider", "home", "draw", "away")
 
-    changed = (
-        tbl.c.home.is_distinct_from(excluded.home)
-        | tbl.c.draw.is_distinct_from(excluded.draw)
-        | tbl.c.away.is_distinct_from(excluded.away)
-    )
+# Threshold above which the VALUES-based upsert is replaced by COPY into a
+# TEMP table + one merge statement; batching gains plateau around 1k rows.
+_COPY_THRESHOLD = 1000
 
-    stmt = stmt.on_conflict_do_update(
-        index_elements=[tbl.c.fixture_id, tbl.c.timestamp, tbl.c.timeline_identifier, tbl.c.provider],
-        set_={
-            "home": excluded.home,
-            "draw": excluded.draw,
-            "away": excluded.away,
-            "computed_at": func.now(),
-        },
-        where=changed,
-    )
+_COPY_MERGE_SQL = """
+    INSERT INTO public.odds_1x2 (fixture_id, timestamp, timeline_identifier, provider, home, draw, away)
+    SELECT fixture_id, timestamp, timeline_identifier, provider, home, draw, away
+    FROM tmp_odds_1x2
+    ON CONFLICT (fixture_id, timestamp, timeline_identifier, provider)
+    DO UPDATE SET
+        home = EXCLUDED.home,
+        draw = EXCLUDED.draw,
+        away = EXCLUDED.away,
+        computed_at = now()
+    WHERE (odds_1x2.home, odds_1x2.draw, odds_1x2.away)
+          IS DISTINCT FROM (EXCLUDED.home, EXCLUDED.draw, EXCLUDED.away)
+"""
 
-    with engine.begin() as conn:
-        res = conn.execute(stmt)
-        return int(res.rowcount or 0)
 
+def _copy_upsert_odds_1x2(engine, rows: List[Tuple]) -> int:
+    """
+    Bulk path: COPY rows into a TEMP table (dropped on commit), then merge
+    with one INSERT ... SELECT ... ON CONFLICT DO UPDATE. Only worth it when
+    the script is looped over many fixtures in one process.
+    """
+    buf = io.StringIO()
+    for row in rows:
+        buf.write(
+            "\t".join(
+                "\\N" if v is None else (v.isoformat() if isinstance(v, datetime) else str(v))
+                for v in row
+            )
+        )
+        buf.write("\n")
+    buf.seek(0)
 
-# ----------------------------
-# DB lookups
-# ----------------------------
-def fetch_fixture(engine, fixture_id: int) -> Dict[str, Any]:
-    sql = text(
-        """
-        SELECT fixture_id, league_id, date AS kickoff, home_team_id, away_team_id
-        FROM public.fixtures
-        WHERE fixture_id = :fixture_id
-        """
-    )
-    with engine.begin() as conn:
-        r = conn.execute(sql, {"fixture_id": fixture_id}).fetchone()
-    if not r:
-        raise RuntimeError(f"Fixture not found in public.fixtures: fixture_id={fixture_id}")
+    raw = engine.raw_connection()
+    try:
+        cur = raw.cursor()
+        cur.execute("CREATE TEMP TABLE tmp_odds_1x2 (LIKE public.odds_1x2 INCLUDING DEFAULTS) ON COMMIT DROP")
+        cur.copy_expert(f"COPY tmp_odds_1x2 ({', '.join(_ODDS_COLUMNS)}) FROM STDIN", buf)
+        cur.execute(_COPY_MERGE_SQL)
+        n = int(cur.rowcount or 0)
+        raw.commit()
+        return n
+    except Exception:
+        raw.rollback()
+        raise
+    finally:
+        raw.close()
+
+
+# execute_values consumes the row tuples directly — no per-row dict
+# construction or named-bind processing on the upsert path.
+_VALUES_UPSERT_SQL = """
+    INSERT INTO public.odds_1x2 (fixture_id, timestamp, timeline_identifier, provider, home, draw, away)
+    VALUES %s
+    ON CONFLICT (fixture_id, timestamp, timeline_identifier, provider)
+    DO UPDATE SET
+        home = EXCLUDED.home,
+        draw = EXCLUDED.draw,
+        away = EXCLUDED.away,
+        computed_at = now()
+    WHERE (odds_1x2.home, odds_1x2.draw, odds_1x2.away)
+          IS DISTINCT FROM (EXCLUDED.home, EXCLUDED.draw, EXCLUDED.away)
+"""
 
-    return {
-        "fixture_id": int(r.fixture_id),
-        "league_id": int(r.league_id) if r.league_id is not None else None,
-        "kickoff": _dt_from_any(r.kickoff),
-        "home_team_id": int(r.home_team_id),
-        "away_team_id": int(r.away_team_id),
-    }
 
+def upsert_odds_1x2(engine, rows: List[Tuple]) -> int:
+    """
+    rows are tuples in _ODDS_COLUMNS order:
+    (fixture_id, timestamp, timeline_identifier, provider, home, draw, away)
+    """
+    global _CREATED
 
-def fetch_prev1_for_home_team(engine, fixture_id: int, home_team_id: int) -> Optional[int]:
-    sql = text(
-        """
-        SELECT prev_1
-        FROM public.previous_matches
-        WHERE fixture_id = :fixture_id
-          AND team_id = :team_id
-        """
-    )
-    with engine.begin() as conn:
-        r = conn.execute(sql, {"fixture_id": fixture_id, "team_id": home_team_id}).fetchone()
-    if not r or r.prev_1 is None:
-        return None
-    return int(r.prev_1)
+    if not rows:
+        return 0
+
+    if not _CREATED:
+        _MD.create_all(engine)
+        _CREATED = True
+
+    if len(rows) > _COPY_THRESHOLD:
+        return _copy_upsert_odds_1x2(engine, rows)
+
+    raw = engine.raw_connection()
+    try:
+        cur = raw.cursor()
+        execute_values(cur, _VALUES_UPSERT_SQL, rows, page_size=500)
+        raw.commit()
+    except Exception:
+        raw.rollback()
+        raise
+    finally:
+        raw.close()
+    return len(rows)
 
 
-def resolve_sport_key_from_league(engine, league_id: int) -> str:
-    sport_key: Optional[str] = None
+# ----------------------------
+# DB lookups
+# ----------------------------
+# Memoized per (conn, league_id): the mapping table is static, so batched
+# runs over many fixtures of the same league hit the DB only once.
+# Connections hash by identity, so two different sessions never share entries.
+@lru_cache(maxsize=256)
+def _sport_key_from_mapping(conn, league_id: int) -> Optional[str]:
     try:
         sql = text(
             """
@@ -164,12 +208,16 @@ def resolve_sport_key_from_league(engine, league_id: int) -> str:
             WHERE league_id = :league_id
             """
         )
-        with engine.begin() as conn:
-            r = conn.execute(sql, {"league_id": league_id}).fetchone()
+        r = conn.execute(sql, {"league_id": league_id}).fetchone()
         if r and r.oa_league_name:
-            sport_key = str(r.oa_league_name).strip()
+            return str(r.oa_league_name).strip()
     except Exception:
-        sport_key = None
+        pass
+    return None
+
+
+def resolve_sport_key_from_league(conn, league_id: int) -> str:
+    sport_key = _sport_key_from_mapping(conn, league_id)
 
     if sport_key:
         return sport_key
@@ -184,41 +232,54 @@ def resolve_sport_key_from_league(engine, league_id: int) -> str:
     )
 
 
-def resolve_from_fixture_id(engine, fixture_id: int) -> Tuple[str, str, datetime, Optional[datetime], Optional[int]]:
-    fx = fetch_fixture(engine, fixture_id)
-    kickoff = fx["kickoff"]
-
+def resolve_from_fixture_id(conn, fixture_id: int) -> Tuple[str, str, datetime, Optional[datetime], Optional[int]]:
+    # One round-trip instead of four: fixture row, oa_event_id, the home
+    # team's prev_1 and its kickoff all come back via LEFT JOINs.
     sql = text(
         """
-        SELECT oa_event_id
-        FROM public.fixtures_matching
-        WHERE fixture_id = :fixture_id
+        SELECT
+            f.fixture_id,
+            f.league_id,
+            f.date AS kickoff,
+            f.home_team_id,
+            f.away_team_id,
+            fm.oa_event_id,
+            pm.prev_1,
+            pf.date AS prev_kickoff
+        FROM public.fixtures f
+        LEFT JOIN public.fixtures_matching fm
+          ON fm.fixture_id = f.fixture_id
+        LEFT JOIN public.previous_matches pm
+          ON pm.fixture_id = f.fixture_id
+         AND pm.team_id = f.home_team_id
+        LEFT JOIN public.fixtures pf
+          ON pf.fixture_id = pm.prev_1
+        WHERE f.fixture_id = :fixture_id
         """
     )
-    with engine.begin() as conn:
-        r = conn.execute(sql, {"fixture_id": fixture_id}).fetchone()
+    r = conn.execute(sql, {"fixture_id": fixture_id}).fetchone()
 
-    if not r or not r.oa_event_id:
+    if not r:
+        raise RuntimeError(f"Fixture not found in public.fixtures: fixture_id={fixture_id}")
+    if not r.oa_event_id:
         raise RuntimeError(
             f"No oa_event_id found for fixture_id={fixture_id}. "
             f"Run database.11_fixtures_matching first."
         )
 
+    kickoff = _dt_from_any(r.kickoff)
     oa_event_id = str(r.oa_event_id)
-    sport_key = resolve_sport_key_from_league(engine, fx["league_id"])
+    sport_key = resolve_sport_key_from_league(conn, int(r.league_id))
 
-    prev1 = fetch_prev1_for_home_team(engine, fixture_id=fixture_id, home_team_id=fx["home_team_id"])
+    prev1 = int(r.prev_1) if r.prev_1 is not None else None
     prev_kickoff: Optional[datetime] = None
-    if prev1 is not None:
-        try:
-            prev_kickoff = fetch_fixture(engine, prev1)["kickoff"]
-        except Exception:
-            prev_kickoff = None
+    if r.prev_kickoff is not None:
+        prev_kickoff = _dt_from_any(r.prev_kickoff)
 
     return sport_key, oa_event_id, kickoff, prev_kickoff, prev1
 
 
-def resolve_from_oa_event_id(engine, oa_event_id: str) -> Tuple[int, str, datetime, Optional[datetime], Optional[int]]:
+def resolve_from_oa_event_id(conn, oa_event_id: str) -> Tuple[int, str, datetime, Optional[datetime], Optional[int]]:
     sql = text(
         """
         SELECT fixture_id
@@ -228,8 +289,7 @@ def resolve_from_oa_event_id(engine, oa_event_id: str) -> Tuple[int, str, dateti
         LIMIT 1
         """
     )
-    with engine.begin() as conn:
-        r = conn.execute(sql, {"oa_event_id": oa_event_id}).fetchone()
+    r = conn.execute(sql, {"oa_event_id": oa_event_id}).fetchone()
 
     if not r or r.fixture_id is None:
         raise RuntimeError(
@@ -238,7 +298,7 @@ def resolve_from_oa_event_id(engine, oa_event_id: str) -> Tuple[int, str, dateti
         )
 
     fixture_id = int(r.fixture_id)
-    sport_key, _, kickoff, prev_kickoff, prev1 = resolve_from_fixture_id(engine, fixture_id)
+    sport_key, _, kickoff, prev_kickoff, prev1 = resolve_from_fixture_id(conn, fixture_id)
     return fixture_id, sport_key, kickoff, prev_kickoff, prev1
 
 
@@ -247,39 +307,111 @@ def resolve_from_oa_event_id(engine, oa_event_id: str) -> Tuple[int, str, dateti
 # ----------------------------
 def build_snapshot_times(kickoff: datetime, prev_kickoff: Optional[datetime]) -> List[datetime]:
     k = _to_utc(kickoff)
-    out: List[datetime] = []
+    out: set = set()
 
     # 2h before kickoff: 10-min interval
-    t = k - timedelta(hours=2)
-    while t <= k - timedelta(minutes=10):
-        out.append(t)
-        t += timedelta(minutes=10)
+    out.update(k - timedelta(minutes=m) for m in range(10, 121, 10))
 
     # 24h to 2h before kickoff: hourly (avoid overlap by stopping at -3h)
-    t = k - timedelta(hours=24)
-    while t <= k - timedelta(hours=3):
-        out.append(t)
-        t += timedelta(hours=1)
+    out.update(k - timedelta(hours=h) for h in range(3, 25))
 
     if prev_kickoff is not None:
         p = _to_utc(prev_kickoff)
-        for h in (1, 2, 3):
-            out.append(p + timedelta(hours=h))
-        for h in (1, 2, 3):
-            out.append(p - timedelta(hours=h))
-        out.append(p - timedelta(days=3))
+        out.update(p + timedelta(hours=h) for h in (1, 2, 3))
+        out.update(p - timedelta(hours=h) for h in (1, 2, 3))
+        out.add(p - timedelta(days=3))
 
-    return sorted(set(out), reverse=True)
+    return sorted(out, reverse=True)
+
+
+# Same schedule as build_snapshot_times, materialized server-side: one
+# round-trip seeds the whole timeline as NULL-odds rows (ROW_NUMBER DESC
+# assigns odd_1 closest to kickoff), so the timeline is complete in the DB
+# before any HTTP fetch starts and the later upsert only fills in prices.
+_SEED_TIMELINE_SQL = text(
+    """
+    WITH base AS (
+        SELECT CAST(:kickoff AS timestamptz) AS k,
+               CAST(:prev_kickoff AS timestamptz) AS p
+    ),
+    ts AS (
+        SELECT generate_series(k - interval '2 hours', k - interval '10 minutes', interval '10 minutes') AS ts
+        FROM base
+        UNION
+        SELECT generate_series(k - interval '24 hours', k - interval '3 hours', interval '1 hour')
+        FROM base
+        UNION
+        SELECT p + h * interval '1 hour'
+        FROM base, unnest(ARRAY[1, 2, 3, -1, -2, -3, -72]) AS h
+        WHERE p IS NOT NULL
+    ),
+    ordered AS (
+        SELECT ts, 'odd_' || ROW_NUMBER() OVER (ORDER BY ts DESC) AS timeline_identifier
+        FROM (SELECT DISTINCT ts FROM ts) d
+    )
+    INSERT INTO public.odds_1x2 (fixture_id, timestamp, timeline_identifier, provider, home, draw, away)
+    SELECT :fixture_id, ts, timeline_identifier, :provider, NULL, NULL, NULL
+    FROM ordered
+    ON CONFLICT (fixture_id, timestamp, timeline_identifier, provider) DO NOTHING
+    """
+)
+
+
+def seed_timeline_rows(
+    engine,
+    fixture_id: int,
+    provider: str,
+    kickoff: datetime,
+    prev_kickoff: Optional[datetime],
+) -> int:
+    global _CREATED
+    if not _CREATED:
+        _MD.create_all(engine)
+        _CREATED = True
+
+    with engine.begin() as conn:
+        res = conn.execute(
+            _SEED_TIMELINE_SQL,
+            {
+                "fixture_id": fixture_id,
+                "provider": provider,
+                "kickoff": _to_utc(kickoff),
+                "prev_kickoff": _to_utc(prev_kickoff) if prev_kickoff is not None else None,
+            },
+        )
+        return int(res.rowcount or 0)
 
 
 # ----------------------------
 # OddsAPI fetch (historical event odds) with BETFAIR
 # ----------------------------
+
+# Shared keep-alive session: the ~30 snapshot calls all hit one host, so
+# reusing connections saves a TCP+TLS handshake per call.
+# Historical snapshots are immutable per (event_id, date), so responses are
+# cached on disk forever — re-running the same fixture makes zero HTTP calls.
+try:
+    import requests_cache
+
+    _SESSION: requests.Session = requests_cache.CachedSession(
+        ".oddsapi_cache",
+        backend="sqlite",
+        expire_after=None,
+        allowable_methods=("GET",),
+        cache_control=False,
+    )
+except ImportError:  # cache is an optimization; plain session works too
+    _SESSION = requests.Session()
+_SESSION.mount("https://", HTTPAdapter(pool_connections=8, pool_maxsize=8))
+
+
 def fetch_h2h_odds_snapshot(
     sport_key: str,
     event_id: str,
     snapshot_dt: datetime,
-    provider: str = "oddsapi",
+    *,
+    api_key: str,
+    url_tmpl: str,
     bookmaker_key: str = "betfair",
     region: str = "eu",
 ) -> Dict[str, Any]:
@@ -290,14 +422,13 @@ def fetch_h2h_odds_snapshot(
     IMPORTANT:
       OddsAPI requires regions or bookmakers; we send BOTH:
         regions=eu, bookmakers=betfair
-    """
-    params = get_access_params(provider)
-    api_key = params["api_token"]
 
-    url_tmpl = get_url(provider, "historical_event_odds")
+    api_key/url_tmpl are resolved once by the caller — the YAML config
+    lookups don't belong in the per-snapshot hot path.
+    """
     url = url_tmpl.format(sport=sport_key, event_id=event_id)
 
-    r = requests.get(
+    r = _SESSION.get(
         url,
         params={
             "apiKey": api_key,
@@ -371,14 +502,17 @@ def main() -> None:
     args = ap.parse_args()
     engine = get_engine()
 
-    if args.fixture_id is not None:
-        fixture_id = int(args.fixture_id)
-        sport_key, oa_event_id, kickoff, prev_kickoff, prev1 = resolve_from_fixture_id(engine, fixture_id)
-        title = f"SportMonks fixture_id={fixture_id}"
-    else:
-        oa_event_id = str(args.oa_event_id).strip()
-        fixture_id, sport_key, kickoff, prev_kickoff, prev1 = resolve_from_oa_event_id(engine, oa_event_id)
-        title = f"OddsAPI event_id={oa_event_id} (resolved fixture_id={fixture_id})"
+    # one connection for all resolution lookups: a single BEGIN/COMMIT
+    # instead of one per helper call
+    with engine.connect() as conn:
+        if args.fixture_id is not None:
+            fixture_id = int(args.fixture_id)
+            sport_key, oa_event_id, kickoff, prev_kickoff, prev1 = resolve_from_fixture_id(conn, fixture_id)
+            title = f"SportMonks fixture_id={fixture_id}"
+        else:
+            oa_event_id = str(args.oa_event_id).strip()
+            fixture_id, sport_key, kickoff, prev_kickoff, prev1 = resolve_from_oa_event_id(conn, oa_event_id)
+            title = f"OddsAPI event_id={oa_event_id} (resolved fixture_id={fixture_id})"
 
     times = build_snapshot_times(kickoff=kickoff, prev_kickoff=prev_kickoff)
 
@@ -391,57 +525,67 @@ def main() -> None:
     print(f"  snapshots:      {len(times)} timestamps")
     print("=" * 140)
 
-    rows_to_store: List[Dict[str, Any]] = []
-
-    for idx, t in enumerate(times, start=1):
-        timeline_id = f"odd_{idx}"  # times sorted DESC: closest to kickoff -> odd_1
-        snap_ts = _to_utc(t)
-
-        try:
-            snap = fetch_h2h_odds_snapshot(
+    provider_label = str(args.provider).strip().lower()
+
+    # resolve credentials/URL template once for all snapshot calls
+    api_key = get_access_params("oddsapi")["api_token"]
+    url_tmpl = get_url("oddsapi", "historical_event_odds")
+
+    # seed the full timeline as NULL-odds rows in one SQL pass so it is
+    # complete even if the run dies mid-fetch; the upsert below fills prices
+    seeded = seed_timeline_rows(engine, fixture_id, provider_label, kickoff, prev_kickoff)
+    if seeded:
+        print(f"[SEED] timeline rows inserted: {seeded}")
+
+    # Each snapshot is an independent HTTP call (~45s timeout worst case);
+    # fetching them concurrently over the shared session makes the wall time
+    # ~1/workers of the serial loop.
+    snaps: Dict[int, Any] = {}
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        futures = {
+            pool.submit(
+                fetch_h2h_odds_snapshot,
                 sport_key=sport_key,
                 event_id=oa_event_id,
-                snapshot_dt=snap_ts,
-                provider="oddsapi",
+                snapshot_dt=_to_utc(t),
+                api_key=api_key,
+                url_tmpl=url_tmpl,
                 bookmaker_key=args.bookmaker,
                 region=args.region,
-            )
+            ): idx
+            for idx, t in enumerate(times, start=1)
+        }
+        for fut in as_completed(futures):
+            idx = futures[fut]
+            try:
+                snaps[idx] = fut.result()
+            except Exception as e:
+                snaps[idx] = e
+
+    rows_to_store: List[Tuple] = []
+
+    # emit prints + rows in timeline order (times sorted DESC: odd_1 closest to kickoff)
+    for idx, t in enumerate(times, start=1):
+        timeline_id = f"odd_{idx}"
+        snap_ts = _to_utc(t)
+        snap = snaps.get(idx)
 
-            home = snap["home"]
-            draw = snap["draw"]
-            away = snap["away"]
+        if isinstance(snap, Exception) or snap is None:
+            print(f"{timeline_id:>6} | snapshot={snap_ts.isoformat()} | ERROR: {snap}")
+            # still store a row with NULL odds so your timeline is complete
+            rows_to_store.append((fixture_id, snap_ts, timeline_id, provider_label, None, None, None))
+            continue
 
-            print(
-                f"{timeline_id:>6} | snapshot={snap_ts.isoformat()} | "
-                f"book={snap['bookmaker_used']} | home={home} draw={draw} away={away}"
-            )
+        home = snap["home"]
+        draw = snap["draw"]
+        away = snap["away"]
 
-            rows_to_store.append(
-                {
-                    "fixture_id": fixture_id,
-                    "timestamp": snap_ts,
-                    "timeline_identifier": timeline_id,
-                    "provider": str(args.provider).strip().lower(),
-                    "home": home,
-                    "draw": draw,
-                    "away": away,
-                }
-            )
+        print(
+            f"{timeline_id:>6} | snapshot={snap_ts.isoformat()} | "
+            f"book={snap['bookmaker_used']} | home={home} draw={draw} away={away}"
+        )
 
-        except Exception as e:
-            print(f"{timeline_id:>6} | snapshot={snap_ts.isoformat()} | ERROR: {e}")
-            # still store a row with NULL odds so your timeline is complete
-            rows_to_store.append(
-                {
-                    "fixture_id": fixture_id,
-                    "timestamp": snap_ts,
-                    "timeline_identifier": timeline_id,
-                    "provider": str(args.provider).strip().lower(),
-                    "home": None,
-                    "draw": None,
-                    "away": None,
-                }
-            )
+        rows_to_store.append((fixture_id, snap_ts, timeline_id, provider_label, home, draw, away))
 
     up = upsert_odds_1x2(engine, rows_to_store)
     print("\n" + "-" * 140)
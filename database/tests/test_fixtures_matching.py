@@ -13,16 +13,14 @@ Usage:
 from __future__ import annotations
 
 import argparse
+import sys
 
+import pandas as pd
 from sqlalchemy import text
 
 from database.connection.engine import get_engine
 
 
-def _pad(s: str, width: int) -> str:
-    return (s or "").ljust(width)
-
-
 def main() -> None:
     ap = argparse.ArgumentParser()
     ap.add_argument("--limit", type=int, default=20)
@@ -69,48 +67,33 @@ def main() -> None:
         """
     )
 
-    with engine.begin() as conn:
-        rows = conn.execute(sql, {"limit": args.limit}).fetchall()
+    df = pd.read_sql(sql, engine, params={"limit": args.limit})
 
-    if not rows:
+    if df.empty:
         print("No rows found (maybe fixtures_matching empty, or you filtered everything out).")
         return
 
-    # Compute widths for nice alignment
-    sm_home_labels = [(r.sm_home_team_name or f"team_id={r.sm_home_team_id}") for r in rows]
-    sm_away_labels = [(r.sm_away_team_name or f"team_id={r.sm_away_team_id}") for r in rows]
-    oa_home_labels = [(r.oa_home_team_name or "—") for r in rows]
-    oa_away_labels = [(r.oa_away_team_name or "—") for r in rows]
-
-    w_sm_home = max(10, min(40, max(len(x) for x in sm_home_labels)))
-    w_sm_away = max(10, min(40, max(len(x) for x in sm_away_labels)))
-    w_oa_home = max(10, min(40, max(len(x) for x in oa_home_labels)))
-    w_oa_away = max(10, min(40, max(len(x) for x in oa_away_labels)))
-
-    print("\n" + "=" * 120)
-    print(f"Fixture matching preview (rows={len(rows)})")
-    print("Sportmonks names from: public.teams.team_name")
-    print("=" * 120)
-
-    for r in rows:
-        sm_date = r.sm_date.isoformat() if r.sm_date is not None else "—"
-        sm_home = r.sm_home_team_name or f"team_id={r.sm_home_team_id}"
-        sm_away = r.sm_away_team_name or f"team_id={r.sm_away_team_id}"
-
-        oa_event_id = r.oa_event_id or "—"
-        oa_date = r.oa_date.isoformat() if r.oa_date is not None else "—"
-        oa_home = r.oa_home_team_name or "—"
-        oa_away = r.oa_away_team_name or "—"
-
-        print(
-            f"SM  fixture_id={r.fixture_id} | {sm_date} | "
-            f"{_pad(sm_home, w_sm_home)} vs {_pad(sm_away, w_sm_away)}"
-        )
-        print(
-            f"OA  event_id={oa_event_id} | {oa_date} | "
-            f"{_pad(oa_home, w_oa_home)} vs {_pad(oa_away, w_oa_away)}"
-        )
-        print("-" * 120)
+    # Vectorized display columns; formatting/alignment is left to to_string
+    # so we emit one big write instead of three prints per row.
+    df["sm_home"] = df["sm_home_team_name"].fillna("team_id=" + df["sm_home_team_id"].astype(str))
+    df["sm_away"] = df["sm_away_team_name"].fillna("team_id=" + df["sm_away_team_id"].astype(str))
+    df["oa_home"] = df["oa_home_team_name"].fillna("—")
+    df["oa_away"] = df["oa_away_team_name"].fillna("—")
+    df["oa_event_id"] = df["oa_event_id"].fillna("—")
+
+    out = df[
+        ["fixture_id", "sm_date", "sm_home", "sm_away", "oa_event_id", "oa_date", "oa_home", "oa_away"]
+    ]
+
+    header = (
+        "\n" + "=" * 120 + "\n"
+        f"Fixture matching preview (rows={len(out)})\n"
+        "Sportmonks names from: public.teams.team_name\n"
+        + "=" * 120 + "\n"
+    )
+    sys.stdout.write(header)
+    sys.stdout.write(out.to_string(index=False, justify="left"))
+    sys.stdout.write("\n")
 
 
 if __name__ == "__main__":
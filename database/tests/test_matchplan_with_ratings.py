@@ -11,7 +11,11 @@ Usage:
 from __future__ import annotations
 
 import argparse
-from typing import Optional, Tuple, Dict, List
+import pickle
+import sys
+from functools import lru_cache
+from pathlib import Path
+from typing import Optional, Tuple, Dict
 
 from sqlalchemy import text
 
@@ -21,46 +25,82 @@ from database.connection.engine import get_engine
 # ----------------------------
 # Detect helper tables/cols
 # ----------------------------
-def _get_public_columns(engine, table_name: str) -> set[str]:
-    sql = text(
-        """
-        SELECT column_name
-        FROM information_schema.columns
-        WHERE table_schema='public' AND table_name=:t
-        """
-    )
-    with engine.begin() as conn:
-        rows = conn.execute(sql, {"t": table_name}).fetchall()
-    return {r[0] for r in rows}
 
+# Only these tables matter for detection, so introspection pulls their
+# columns in one round-trip instead of the whole public schema.
+_DETECT_TABLES = ("teams", "team", "teams_meta", "teams_info", "fixtures")
+
+# Introspection results are pickled to disk together with an md5 token over
+# the same column set; warm runs skip information_schema entirely and a
+# schema change invalidates the cache via the token.
+_SCHEMA_CACHE_PATH = Path(__file__).resolve().parents[1] / "output" / ".schema_cache.pkl"
 
-def detect_teams_source(engine) -> Tuple[Optional[str], Optional[str], Optional[str]]:
-    candidates_tables = [
-        ("public", "teams"),
-        ("public", "team"),
-        ("public", "teams_meta"),
-        ("public", "teams_info"),
-    ]
-    candidate_id_cols = ["team_id", "id"]
-    candidate_name_cols = ["name", "team_name", "display_name"]
 
+def _load_schema_cache() -> Optional[dict]:
+    try:
+        with _SCHEMA_CACHE_PATH.open("rb") as f:
+            return pickle.load(f)
+    except Exception:
+        return None
+
+
+def _save_schema_cache(token: str, table_to_cols: Dict[str, set[str]]) -> None:
+    try:
+        _SCHEMA_CACHE_PATH.parent.mkdir(parents=True, exist_ok=True)
+        with _SCHEMA_CACHE_PATH.open("wb") as f:
+            pickle.dump({"token": token, "table_to_cols": table_to_cols}, f)
+    except Exception:
+        pass  # cache is best-effort
+
+
+def load_table_columns(engine) -> Dict[str, set[str]]:
+    """
+    Return {table_name: {column, ...}} for the detection candidate tables,
+    from the disk cache when the schema token still matches.
+    """
     with engine.begin() as conn:
-        cols = conn.execute(
+        token = conn.execute(
             text(
                 """
-                SELECT table_schema, table_name, column_name
+                SELECT COALESCE(md5(string_agg(table_name || column_name, ','
+                       ORDER BY table_name, column_name)), '')
                 FROM information_schema.columns
-                WHERE table_schema = 'public'
+                WHERE table_schema = 'public' AND table_name = ANY(:tables)
                 """
-            )
+            ),
+            {"tables": list(_DETECT_TABLES)},
+        ).scalar_one()
+
+        cached = _load_schema_cache()
+        if cached and cached.get("token") == token:
+            return cached["table_to_cols"]
+
+        rows = conn.execute(
+            text(
+                """
+                SELECT table_name, column_name
+                FROM information_schema.columns
+                WHERE table_schema = 'public' AND table_name = ANY(:tables)
+                """
+            ),
+            {"tables": list(_DETECT_TABLES)},
         ).fetchall()
 
-    table_to_cols: Dict[Tuple[str, str], set[str]] = {}
-    for schema, table, col in cols:
-        table_to_cols.setdefault((schema, table), set()).add(col)
+    table_to_cols: Dict[str, set[str]] = {}
+    for table, col in rows:
+        table_to_cols.setdefault(table, set()).add(col)
+
+    _save_schema_cache(token, table_to_cols)
+    return table_to_cols
+
 
-    for schema, table in candidates_tables:
-        available = table_to_cols.get((schema, table))
+def detect_teams_source(table_to_cols: Dict[str, set[str]]) -> Tuple[Optional[str], Optional[str], Optional[str]]:
+    candidates_tables = ["teams", "team", "teams_meta", "teams_info"]
+    candidate_id_cols = ["team_id", "id"]
+    candidate_name_cols = ["name", "team_name", "display_name"]
+
+    for table in candidates_tables:
+        available = table_to_cols.get(table)
         if not available:
             continue
 
@@ -68,17 +108,17 @@ def detect_teams_source(engine) -> Tuple[Optional[str], Optional[str], Optional[
         name_col = next((c for c in candidate_name_cols if c in available), None)
 
         if id_col and name_col:
-            return f"{schema}.{table}", id_col, name_col
+            return f"public.{table}", id_col, name_col
 
     return None, None, None
 
 
-def detect_score_cols(engine) -> Tuple[Optional[str], Optional[str]]:
+def detect_score_cols(table_to_cols: Dict[str, set[str]]) -> Tuple[Optional[str], Optional[str]]:
     """
     Try to find home/away score columns in public.fixtures.
     Returns (home_score_col, away_score_col) or (None, None).
     """
-    cols = _get_public_columns(engine, "fixtures")
+    cols = table_to_cols.get("fixtures", set())
 
     candidates = [
         ("home_score", "away_score"),
@@ -106,6 +146,85 @@ def _w_d_l(team_goals: Optional[int], opp_goals: Optional[int]) -> str:
     return "D"
 
 
+@lru_cache(maxsize=32)
+def _build_matchplan_sql(teams_table: str, team_id_col: str, team_name_col: str,
+                         home_score_col: Optional[str], away_score_col: Optional[str]):
+    # Built once per schema layout; repeat calls reuse the string. Plain
+    # pyformat SQL — main() runs it on a raw DB-API cursor so rows come
+    # back as typed tuples with no SQLAlchemy Row wrapping.
+    # Build SELECT parts for score columns (or NULLs if not found)
+    if home_score_col and away_score_col:
+        score_cte = f"f.{home_score_col} AS home_score, f.{away_score_col} AS away_score"
+    else:
+        score_cte = "NULL::int AS home_score, NULL::int AS away_score"
+
+    # The LIMITed fixture set is materialized first, then team_ratings is
+    # joined ONCE and pivoted to home/away with FILTER aggregates — one
+    # scan of team_ratings instead of two index seeks per fixture.
+    #
+    # The home/away filter is split into two UNION ALL branches so the
+    # planner can hit (season_id, home_team_id) / (season_id, away_team_id)
+    # indexes instead of falling back to a seq scan for the OR-style
+    # ":team_id IN (home, away)" predicate.
+    sql = f"""
+        WITH my AS (
+            SELECT * FROM (
+                SELECT
+                    f.fixture_id,
+                    f.date AS fixture_date,
+                    f.home_team_id,
+                    f.away_team_id,
+                    {score_cte}
+                FROM public.fixtures f
+                WHERE f.season_id = %(season_id)s
+                  AND f.home_team_id = %(team_id)s
+                UNION ALL
+                SELECT
+                    f.fixture_id,
+                    f.date AS fixture_date,
+                    f.home_team_id,
+                    f.away_team_id,
+                    {score_cte}
+                FROM public.fixtures f
+                WHERE f.season_id = %(season_id)s
+                  AND f.away_team_id = %(team_id)s
+            ) u
+            ORDER BY u.fixture_date, u.fixture_id
+            LIMIT %(limit)s
+        )
+        SELECT
+            my.fixture_id,
+            my.fixture_date,
+            my.home_team_id,
+            my.away_team_id,
+            my.home_score,
+            my.away_score,
+
+            th.{team_name_col} AS home_team_name,
+            ta.{team_name_col} AS away_team_name,
+
+            CAST(MAX(tr.avg_rating) FILTER (WHERE tr.team_id = my.home_team_id) AS float8) AS home_avg_rating,
+            CAST(MAX(tr.avg_rating) FILTER (WHERE tr.team_id = my.away_team_id) AS float8) AS away_avg_rating,
+
+            MAX(LENGTH(CASE WHEN my.home_team_id = %(team_id)s
+                            THEN ta.{team_name_col} || ' (' || my.away_team_id || ')'
+                            ELSE th.{team_name_col} || ' (' || my.home_team_id || ')'
+                       END)) OVER () AS max_opp_w
+        FROM my
+        JOIN {teams_table} th ON th.{team_id_col} = my.home_team_id
+        JOIN {teams_table} ta ON ta.{team_id_col} = my.away_team_id
+        LEFT JOIN public.team_ratings tr
+            ON tr.fixture_id = my.fixture_id
+           AND tr.team_id IN (my.home_team_id, my.away_team_id)
+        GROUP BY
+            my.fixture_id, my.fixture_date, my.home_team_id, my.away_team_id,
+            my.home_score, my.away_score,
+            th.{team_name_col}, ta.{team_name_col}
+        ORDER BY my.fixture_date, my.fixture_id
+        """
+    return sql
+
+
 def main() -> None:
     ap = argparse.ArgumentParser()
     ap.add_argument(
@@ -125,62 +244,31 @@ def main() -> None:
 
     engine = get_engine()
 
-    teams_table, team_id_col, team_name_col = detect_teams_source(engine)
+    table_to_cols = load_table_columns(engine)
+
+    teams_table, team_id_col, team_name_col = detect_teams_source(table_to_cols)
     if not teams_table:
         raise RuntimeError("Could not find a teams table with names (expected public.teams(team_id, name) or similar).")
 
-    home_score_col, away_score_col = detect_score_cols(engine)
+    home_score_col, away_score_col = detect_score_cols(table_to_cols)
 
-    # Build SELECT parts for score columns (or NULLs if not found)
-    if home_score_col and away_score_col:
-        score_select = f"f.{home_score_col} AS home_score, f.{away_score_col} AS away_score"
-    else:
-        score_select = "NULL::int AS home_score, NULL::int AS away_score"
+    sql = _build_matchplan_sql(teams_table, team_id_col, team_name_col, home_score_col, away_score_col)
 
-    sql = text(
-        f"""
-        SELECT
-            f.fixture_id,
-            f.date AS fixture_date,
-            f.home_team_id,
-            f.away_team_id,
-            {score_select},
-
-            th.{team_name_col} AS home_team_name,
-            ta.{team_name_col} AS away_team_name,
-
-            trh.avg_rating AS home_avg_rating,
-            tra.avg_rating AS away_avg_rating
-        FROM public.fixtures f
-        JOIN {teams_table} th ON th.{team_id_col} = f.home_team_id
-        JOIN {teams_table} ta ON ta.{team_id_col} = f.away_team_id
-        LEFT JOIN public.team_ratings trh
-            ON trh.fixture_id = f.fixture_id AND trh.team_id = f.home_team_id
-        LEFT JOIN public.team_ratings tra
-            ON tra.fixture_id = f.fixture_id AND tra.team_id = f.away_team_id
-        WHERE f.season_id = :season_id
-          AND (:team_id IN (f.home_team_id, f.away_team_id))
-        ORDER BY f.date, f.fixture_id
-        LIMIT :limit
-        """
-    )
-
-    with engine.begin() as conn:
-        matches = conn.execute(sql, {"team_id": args.team_id, "season_id": args.season_id, "limit": args.limit}).fetchall()
+    # Raw DB-API cursor: psycopg2 already delivers native int/float for
+    # these columns, so the per-cell int()/float() casts disappear and each
+    # row is a plain tuple.
+    raw = engine.raw_connection()
+    try:
+        cur = raw.cursor()
+        cur.execute(sql, {"team_id": args.team_id, "season_id": args.season_id, "limit": args.limit})
+        matches = cur.fetchall()
+    finally:
+        raw.close()
 
     if not matches:
         print(f"No fixtures found for team_id={args.team_id} in season_id={args.season_id}.")
         return
 
-    # Precompute opponent labels for alignment
-    opponent_labels: List[str] = []
-    for m in matches:
-        if int(m.home_team_id) == args.team_id:
-            opponent_labels.append(f"{m.away_team_name} ({int(m.away_team_id)})")
-        else:
-            opponent_labels.append(f"{m.home_team_name} ({int(m.home_team_id)})")
-    max_opp = max(len(s) for s in opponent_labels)
-
     print("\n" + "=" * 110)
     print(f"Match plan (team_id={args.team_id}, season_id={args.season_id})")
     if home_score_col and away_score_col:
@@ -189,44 +277,36 @@ def main() -> None:
         print("Scores from fixtures: NOT FOUND (printing NA)")
     print("=" * 110)
 
-    for idx, m in enumerate(matches):
-        fixture_id = int(m.fixture_id)
-        d = m.fixture_date
-
-        home_id = int(m.home_team_id)
-        away_id = int(m.away_team_id)
-
-        home_name = m.home_team_name
-        away_name = m.away_team_name
-
-        home_score = int(m.home_score) if m.home_score is not None else None
-        away_score = int(m.away_score) if m.away_score is not None else None
-
-        home_r = float(m.home_avg_rating) if m.home_avg_rating is not None else None
-        away_r = float(m.away_avg_rating) if m.away_avg_rating is not None else None
-
+    # Opponent-column width comes from the windowed MAX(LENGTH(...)) in the
+    # query, so the loop runs once and formats alignment inline. Lines are
+    # buffered and flushed with one stdout write instead of a print per row.
+    buf: list[str] = []
+    append = buf.append
+    for (fixture_id, d, home_id, away_id, home_score, away_score,
+         home_name, away_name, home_r, away_r, max_opp_w) in matches:
         # Perspective: selected team
         if home_id == args.team_id:
-            opponent = opponent_labels[idx].ljust(max_opp)
+            opponent = f"{away_name} ({away_id})".ljust(max_opp_w)
             team_goals, opp_goals = home_score, away_score
             team_rating, opp_rating = home_r, away_r
-            scoreline = f"{home_score}-{away_score}" if home_score is not None and away_score is not None else "NA"
         else:
-            opponent = opponent_labels[idx].ljust(max_opp)
+            opponent = f"{home_name} ({home_id})".ljust(max_opp_w)
             team_goals, opp_goals = away_score, home_score
             team_rating, opp_rating = away_r, home_r
-            scoreline = f"{home_score}-{away_score}" if home_score is not None and away_score is not None else "NA"
+        scoreline = f"{home_score}-{away_score}" if home_score is not None and away_score is not None else "NA"
 
         outcome = _w_d_l(team_goals, opp_goals)
 
         tr = f"{team_rating:.2f}" if team_rating is not None else "NA"
         or_ = f"{opp_rating:.2f}" if opp_rating is not None else "NA"
 
-        print(
+        append(
             f"{d} | fixture_id={fixture_id} | opponent={opponent} | "
-            f"score={scoreline:>7} ({outcome}) | rating_team={tr:>5} | rating_opp={or_:>5}"
+            f"score={scoreline:>7} ({outcome}) | rating_team={tr:>5} | rating_opp={or_:>5}\n"
         )
 
+    sys.stdout.write("".join(buf))
+
 
 if __name__ == "__main__":
     main()
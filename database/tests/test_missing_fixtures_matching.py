@@ -14,13 +14,21 @@ Usage:
 from __future__ import annotations
 
 import argparse
+import csv
+import gzip
+import hashlib
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from dataclasses import dataclass
 from datetime import datetime, timedelta, timezone
+from functools import lru_cache
 from pathlib import Path
 from typing import Any, Dict, List, Optional, Tuple
 
-import pandas as pd
+import orjson
 import requests
+from requests.adapters import HTTPAdapter, Retry
 from sqlalchemy import text
 
 from database.connection.engine import get_engine
@@ -45,6 +53,7 @@ def _iso(dt: datetime) -> str:
     return _to_utc(dt).strftime("%Y-%m-%dT%H:%M:%SZ")
 
 
+@lru_cache(maxsize=1)
 def _find_league_mapping_csv() -> Optional[Path]:
     """
     Best-effort: find a league mapping csv in database/output/.
@@ -69,36 +78,99 @@ def _find_league_mapping_csv() -> Optional[Path]:
     return None
 
 
+@lru_cache(maxsize=1)
 def load_league_id_to_sport_key() -> Dict[int, str]:
     """
     Load mapping league_id -> oa_league_name (which is actually OddsAPI sport_key).
     Expects columns: league_id, league_name, oa_league_name
+
+    Cached per process. stdlib csv is plenty for a file this small and
+    keeps pandas off this script's import path.
     """
     path = _find_league_mapping_csv()
     if path is None:
         return {}
 
-    df = pd.read_csv(path)
-    cols = {c.lower(): c for c in df.columns}
+    out: Dict[int, str] = {}
+    with open(path, newline="") as f:
+        reader = csv.DictReader(f)
+        cols = {c.lower(): c for c in (reader.fieldnames or [])}
+
+        if "league_id" not in cols or "oa_league_name" not in cols:
+            return {}
+
+        league_id_col = cols["league_id"]
+        oa_col = cols["oa_league_name"]
+
+        for row in reader:
+            try:
+                lid = int(row[league_id_col])
+            except (TypeError, ValueError):
+                continue
+            sk = (row[oa_col] or "").strip()
+            if sk and sk.lower() != "nan":
+                out[lid] = sk
+    return out
 
-    if "league_id" not in cols or "oa_league_name" not in cols:
-        return {}
 
-    league_id_col = cols["league_id"]
-    oa_col = cols["oa_league_name"]
+# Keep-alive session with retries: repeated OddsAPI calls reuse one TLS
+# connection instead of paying a handshake each time.
+_SESSION = requests.Session()
+_SESSION.mount(
+    "https://",
+    HTTPAdapter(pool_connections=4, pool_maxsize=8, max_retries=Retry(total=3, backoff_factor=0.2)),
+)
 
-    out: Dict[int, str] = {}
-    for _, row in df.iterrows():
-        try:
-            lid = int(row[league_id_col])
-        except Exception:
-            continue
-        sk = str(row[oa_col]).strip()
-        if sk and sk.lower() != "nan":
-            out[lid] = sk
+
+def group_by_window(
+    rows: List[Tuple[int, str, datetime]],
+    pad: timedelta = timedelta(days=1),
+) -> List[Tuple[str, datetime, datetime, List[int]]]:
+    """
+    Coalesce (fixture_id, sport_key, kickoff) rows into merged query windows:
+    fixtures of the same sport_key whose [kickoff-pad, kickoff+pad] windows
+    overlap share one API call. Returns (sport_key, from, to, fixture_ids).
+    """
+    merged: List[Tuple[str, datetime, datetime, List[int]]] = []
+    for fid, sk, kickoff in sorted(rows, key=lambda r: (r[1], r[2])):
+        lo, hi = kickoff - pad, kickoff + pad
+        if merged and merged[-1][0] == sk and lo <= merged[-1][2]:
+            prev_sk, prev_lo, prev_hi, fids = merged[-1]
+            merged[-1] = (prev_sk, prev_lo, max(prev_hi, hi), fids + [fid])
+        else:
+            merged.append((sk, lo, hi, [fid]))
+    return merged
+
+
+def fetch_events_for_windows(
+    groups: List[Tuple[str, datetime, datetime, List[int]]],
+    max_workers: int = 8,
+) -> Dict[Tuple[str, datetime, datetime], List[Dict[str, Any]]]:
+    """
+    Fetch events for many coalesced windows (from group_by_window) in
+    parallel. The calls are pure HTTP waits, so a small thread pool gives
+    close to max_workers-fold wall-clock speedup; the shared _SESSION
+    pools connections and its Retry/backoff keeps us polite toward the
+    provider's rate limits.
+    """
+    out: Dict[Tuple[str, datetime, datetime], List[Dict[str, Any]]] = {}
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        futs = {
+            pool.submit(oddsapi_historical_events_in_window, sk, w_from, w_to): (sk, w_from, w_to)
+            for sk, w_from, w_to, _fids in groups
+        }
+        for fut in as_completed(futs):
+            out[futs[fut]] = fut.result()
     return out
 
 
+# Historical events never mutate within a past window, so responses are
+# cached on disk (gzipped JSON, keyed by sport_key + window) and repeat
+# runs skip the HTTP round-trip entirely while the TTL holds.
+_OA_CACHE_DIR = Path(__file__).resolve().parents[1] / "output" / ".oa_cache"
+_OA_CACHE_TTL = 24 * 3600  # seconds
+
+
 def oddsapi_historical_events_in_window(
     sport_key: str,
     commence_from: datetime,
@@ -108,19 +180,28 @@ def oddsapi_historical_events_in_window(
     """
     Calls OddsAPI historical events endpoint for a sport_key, filtered by commenceTimeFrom/To.
     We set 'date' to the end of the window (UTC) to get a snapshot >= events.
+    Responses are cached under database/output/.oa_cache for _OA_CACHE_TTL.
     """
+    # Choose snapshot date as window end (UTC) so OddsAPI returns the closest snapshot <= that time.
+    date_iso = _iso(commence_to)
+    from_iso = _iso(commence_from)
+    to_iso = _iso(commence_to)
+
+    key = hashlib.sha1(f"{sport_key}|{from_iso}|{to_iso}".encode()).hexdigest()
+    fpath = _OA_CACHE_DIR / f"{key}.json.gz"
+    try:
+        if fpath.exists() and time.time() - fpath.stat().st_mtime < _OA_CACHE_TTL:
+            return orjson.loads(gzip.decompress(fpath.read_bytes()))
+    except Exception:
+        pass  # cache is best-effort; fall through to the API
+
     params = get_access_params(provider)
     api_key = params["api_token"]
 
     url_tmpl = get_url(provider, "historical_events")  # should be like: https://api.the-odds-api.com/v4/historical/sports/{sport}/events
     url = url_tmpl.format(sport=sport_key)
 
-    # Choose snapshot date as window end (UTC) so OddsAPI returns the closest snapshot <= that time.
-    date_iso = _iso(commence_to)
-    from_iso = _iso(commence_from)
-    to_iso = _iso(commence_to)
-
-    r = requests.get(
+    r = _SESSION.get(
         url,
         params={
             "apiKey": api_key,
@@ -132,42 +213,24 @@ def oddsapi_historical_events_in_window(
         timeout=45,
     )
     r.raise_for_status()
-    payload = r.json()
-    return payload.get("data", []) or []
-
+    # orjson parses the raw bytes in C, noticeably faster for big payloads
+    payload = orjson.loads(r.content)
+    events = payload.get("data", []) or []
 
-def main() -> None:
-    ap = argparse.ArgumentParser()
-    ap.add_argument("--limit", type=int, default=500)
-    ap.add_argument("--league-id", type=int, default=None, help="optional filter: only this league_id")
-    ap.add_argument("--season-id", type=int, default=None, help="optional filter: only this season_id (from fixtures)")
-    args = ap.parse_args()
-
-    engine = get_engine()
-
-    league_filter = ""
-    season_filter = ""
-    params: Dict[str, Any] = {"limit": args.limit}
+    try:
+        _OA_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+        fpath.write_bytes(gzip.compress(orjson.dumps(events)))
+    except Exception:
+        pass  # cache is best-effort
 
-    if args.league_id is not None:
-        league_filter = "AND f.league_id = :league_id"
-        params["league_id"] = args.league_id
+    return events
 
-    if args.season_id is not None:
-        season_filter = "AND f.season_id = :season_id"
-        params["season_id"] = args.season_id
 
-    sql = text(
-        f"""
-        SELECT
-            f.fixture_id,
-            f.date AS sm_date,
-            f.league_id,
-            f.home_team_id,
-            f.away_team_id,
-            th.team_name AS home_team_name,
-            ta.team_name AS away_team_name,
-            fm.oa_event_id
+@lru_cache(maxsize=32)
+def _build_missing_sqls(league_filter: str, season_filter: str):
+    """Width + listing statements, parsed once per filter combination."""
+    # Shared filtered set: once for the tiny width aggregate, once streamed.
+    from_where = f"""
         FROM public.fixtures f
         LEFT JOIN public.fixtures_matching fm
           ON fm.fixture_id = f.fixture_id
@@ -181,49 +244,112 @@ def main() -> None:
           {league_filter}
           {season_filter}
           AND (fm.oa_event_id IS NULL)
+    """
+
+    # Column widths come from one cheap aggregate over the same (limited)
+    # set, so the big query can stream straight to stdout without being
+    # buffered for a width pre-pass.
+    sql_widths = text(
+        f"""
+        SELECT
+            COUNT(*) AS n,
+            LEAST(40, GREATEST(10, COALESCE(MAX(LENGTH(COALESCE(lim.home_team_name, 'team_id=' || lim.home_team_id))), 10))) AS w_home,
+            LEAST(40, GREATEST(10, COALESCE(MAX(LENGTH(COALESCE(lim.away_team_name, 'team_id=' || lim.away_team_id))), 10))) AS w_away
+        FROM (
+            SELECT f.home_team_id, f.away_team_id, th.team_name AS home_team_name, ta.team_name AS away_team_name
+            {from_where}
+            ORDER BY f.date, f.fixture_id
+            LIMIT :limit
+        ) lim
+        """
+    )
+
+    sql = text(
+        f"""
+        SELECT
+            f.fixture_id,
+            f.date AS sm_date,
+            f.league_id,
+            f.home_team_id,
+            f.away_team_id,
+            th.team_name AS home_team_name,
+            ta.team_name AS away_team_name,
+            fm.oa_event_id
+        {from_where}
         ORDER BY f.date, f.fixture_id
         LIMIT :limit
         """
     )
+    return sql_widths, sql
 
-    with engine.begin() as conn:
-        rows = conn.execute(sql, params).fetchall()
 
-    if not rows:
-        print("No missing matches found 🎉 (or filters excluded everything).")
-        return
+def main() -> None:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--limit", type=int, default=500)
+    ap.add_argument("--league-id", type=int, default=None, help="optional filter: only this league_id")
+    ap.add_argument("--season-id", type=int, default=None, help="optional filter: only this season_id (from fixtures)")
+    args = ap.parse_args()
 
-    # widths
-    home_names = [(r.home_team_name or f"team_id={r.home_team_id}") for r in rows]
-    away_names = [(r.away_team_name or f"team_id={r.away_team_id}") for r in rows]
-    w_home = max(10, min(40, max(len(x) for x in home_names)))
-    w_away = max(10, min(40, max(len(x) for x in away_names)))
+    engine = get_engine()
+
+    league_filter = ""
+    season_filter = ""
+    params: Dict[str, Any] = {"limit": args.limit}
 
-    print("\n" + "=" * 120)
-    print(f"Fixtures missing OddsAPI match (rows={len(rows)})")
     if args.league_id is not None:
-        print(f"Filter: league_id={args.league_id}")
-    if args.season_id is not None:
-        print(f"Filter: season_id={args.season_id}")
-    print("=" * 120)
+        league_filter = "AND f.league_id = :league_id"
+        params["league_id"] = args.league_id
 
-    for r in rows:
-        dt = r.sm_date.isoformat() if r.sm_date is not None else "—"
-        home = r.home_team_name or f"team_id={r.home_team_id}"
-        away = r.away_team_name or f"team_id={r.away_team_id}"
+    if args.season_id is not None:
+        season_filter = "AND f.season_id = :season_id"
+        params["season_id"] = args.season_id
 
-        print(
-            f"fixture_id={r.fixture_id} | {dt} | "
-            f"{_pad(home, w_home)} vs {_pad(away, w_away)} | league_id={r.league_id}"
-        )
+    sql_widths, sql = _build_missing_sqls(league_filter, season_filter)
+
+    with engine.connect() as conn:
+        n_rows, w_home, w_away = conn.execute(sql_widths, params).fetchone()
+
+        if not n_rows:
+            print("No missing matches found 🎉 (or filters excluded everything).")
+            return
+
+        print("\n" + "=" * 120)
+        print(f"Fixtures missing OddsAPI match (rows={n_rows})")
+        if args.league_id is not None:
+            print(f"Filter: league_id={args.league_id}")
+        if args.season_id is not None:
+            print(f"Filter: season_id={args.season_id}")
+        print("=" * 120)
+
+        # Server-side cursor: rows arrive in yield_per batches, lines are
+        # buffered and flushed every 4096 rows with one stdout write, so
+        # both memory and syscall count stay flat for any --limit.
+        last = None
+        buf: list[str] = []
+        append = buf.append
+        result = conn.execution_options(stream_results=True, yield_per=1000).execute(sql, params)
+        for r in result:
+            last = r
+            dt = r.sm_date.isoformat() if r.sm_date is not None else "—"
+            home = r.home_team_name or f"team_id={r.home_team_id}"
+            away = r.away_team_name or f"team_id={r.away_team_id}"
+
+            append(
+                f"fixture_id={r.fixture_id} | {dt} | "
+                f"{_pad(home, w_home)} vs {_pad(away, w_away)} | league_id={r.league_id}\n"
+            )
+            if len(buf) >= 4096:
+                sys.stdout.write("".join(buf))
+                buf.clear()
+
+        sys.stdout.write("".join(buf))
 
     print("\nNote: These are Sportmonks fixtures where fixtures_matching.oa_event_id is NULL (unmatched).")
 
     # ------------------------------------------------------------------
     # EXTRA: OddsAPI call for the last fixture in the list (last element)
     # ------------------------------------------------------------------
-    last = rows[-1]
-    if last.sm_date is None:
+    if last is None or last.sm_date is None:
         print("\n[OddsAPI preview] Last fixture has no date -> skipping OddsAPI call.")
         return
 
@@ -269,18 +395,17 @@ def main() -> None:
         return
 
     # Pretty print events
-    # (limit printed events just in case there are too many)
-    print(f"[OddsAPI preview] events returned: {len(events)}")
-    print("-" * 120)
-    for e in events[:200]:
-        eid = e.get("id", "—")
-        ct = e.get("commence_time", "—")
-        ht = e.get("home_team", "—")
-        at = e.get("away_team", "—")
-        print(f"{ct} | event_id={eid} | {ht} vs {at}")
-
+    # (limit printed events just in case there are too many; one stdout
+    #  write for the whole block instead of one syscall per line)
+    lines = [f"[OddsAPI preview] events returned: {len(events)}", "-" * 120]
+    lines.extend(
+        f"{e.get('commence_time', '—')} | event_id={e.get('id', '—')} | "
+        f"{e.get('home_team', '—')} vs {e.get('away_team', '—')}"
+        for e in events[:200]
+    )
     if len(events) > 200:
-        print(f"... truncated, showing first 200 of {len(events)} events.")
+        lines.append(f"... truncated, showing first 200 of {len(events)} events.")
+    sys.stdout.write("\n".join(lines) + "\n")
 
 
 if __name__ == "__main__":
@@ -1,18 +1,53 @@
 from __future__ import annotations
 
+import argparse
+
 from sqlalchemy import text
 from database.connection.engine import get_engine
 from api_calls.helpers.general import get_current_provider
 
 
+def ensure_indexes(engine) -> None:
+    """
+    One-shot DDL + ANALYZE so the last-5 branches resolve as index seeks.
+    IF NOT EXISTS makes re-runs free. (Plain CREATE INDEX, not
+    CONCURRENTLY — these run inside a transaction.)
+    """
+    stmts = [
+        "CREATE INDEX IF NOT EXISTS idx_fixtures_prov_season_home_date "
+        "ON public.fixtures (provider, season_id, home_team_id, date DESC)",
+        "CREATE INDEX IF NOT EXISTS idx_fixtures_prov_season_away_date "
+        "ON public.fixtures (provider, season_id, away_team_id, date DESC)",
+        "ANALYZE public.fixtures",
+    ]
+    with engine.begin() as conn:
+        for stmt in stmts:
+            conn.execute(text(stmt))
+    print("Ensured indexes + fresh stats for public.fixtures")
+
+
 def main() -> None:
+    ap = argparse.ArgumentParser()
+    ap.add_argument(
+        "--ensure-indexes",
+        action="store_true",
+        help="Create supporting indexes (if missing) and ANALYZE public.fixtures before querying.",
+    )
+    args = ap.parse_args()
+
     provider = get_current_provider(default="sportmonks")
     provider = provider.strip().lower()
 
     engine = get_engine()
 
+    if args.ensure_indexes:
+        ensure_indexes(engine)
+
     with engine.begin() as conn:
-        # 1) Pick a random fixture
+        # 1) Pick a random fixture. ORDER BY random() sorts the whole
+        #    provider slice just to keep one row; seeking to a random point
+        #    in the fixture_id range is an index walk instead. Slightly
+        #    biased toward ids after gaps, which is fine for a spot check.
         fixture = conn.execute(
             text(
                 """
@@ -24,7 +59,13 @@ def main() -> None:
                     away_team_id
                 FROM public.fixtures
                 WHERE provider = :provider
-                ORDER BY random()
+                  AND fixture_id >= (
+                      SELECT (MIN(fixture_id)
+                              + floor(random() * (MAX(fixture_id) - MIN(fixture_id) + 1)))::bigint
+                      FROM public.fixtures
+                      WHERE provider = :provider
+                  )
+                ORDER BY fixture_id
                 LIMIT 1
                 """
             ),
@@ -37,30 +78,6 @@ def main() -> None:
         home_team_id = fixture["home_team_id"]
         away_team_id = fixture["away_team_id"]
 
-        def team_name(conn, team_id: int) -> str:
-            res = conn.execute(
-                text(
-                    """
-                    SELECT team_name
-                    FROM public.teams
-                    WHERE team_id = :team_id
-                    """
-                ),
-                {"team_id": team_id},
-            ).scalar_one_or_none()
-
-            return res or f"[unknown:{team_id}]"
-
-        home_name = team_name(conn, home_team_id)
-        away_name = team_name(conn, away_team_id)
-
-        print("\n=== RANDOM FIXTURE ===")
-        print(f"Fixture ID : {fixture_id}")
-        print(f"Season ID  : {season_id}")
-        print(f"Date       : {date}")
-        print(f"Home Team  : {home_name} ({home_team_id})")
-        print(f"Away Team  : {away_name} ({away_team_id})")
-
         # 2) Fetch previous_matches entries
         prev_matches = conn.execute(
             text(
@@ -79,56 +96,135 @@ def main() -> None:
             },
         ).mappings().all()
 
+        # 3) Fetch last 5 fixtures for both teams in ONE round-trip: the two
+        #    identically shaped queries are fused with UNION ALL and tagged
+        #    by side, then partitioned back in Python. Within each side the
+        #    home/away OR is itself split into two LIMITed branches so the
+        #    planner runs two index seeks on the (provider, season_id,
+        #    {home,away}_team_id, date DESC) indexes instead of a bitmap OR.
+        last_rows = conn.execute(
+            text(
+                """
+                (
+                    SELECT 'home' AS side, u.*
+                    FROM (
+                        (
+                            SELECT f.*
+                            FROM public.fixtures f
+                            WHERE f.provider = :provider
+                              AND f.season_id = :season_id
+                              AND f.date < :date
+                              AND f.home_team_id = :home
+                            ORDER BY f.date DESC
+                            LIMIT 5
+                        )
+                        UNION ALL
+                        (
+                            SELECT f.*
+                            FROM public.fixtures f
+                            WHERE f.provider = :provider
+                              AND f.season_id = :season_id
+                              AND f.date < :date
+                              AND f.away_team_id = :home
+                            ORDER BY f.date DESC
+                            LIMIT 5
+                        )
+                    ) u
+                    ORDER BY u.date DESC
+                    LIMIT 5
+                )
+                UNION ALL
+                (
+                    SELECT 'away' AS side, u.*
+                    FROM (
+                        (
+                            SELECT f.*
+                            FROM public.fixtures f
+                            WHERE f.provider = :provider
+                              AND f.season_id = :season_id
+                              AND f.date < :date
+                              AND f.home_team_id = :away
+                            ORDER BY f.date DESC
+                            LIMIT 5
+                        )
+                        UNION ALL
+                        (
+                            SELECT f.*
+                            FROM public.fixtures f
+                            WHERE f.provider = :provider
+                              AND f.season_id = :season_id
+                              AND f.date < :date
+                              AND f.away_team_id = :away
+                            ORDER BY f.date DESC
+                            LIMIT 5
+                        )
+                    ) u
+                    ORDER BY u.date DESC
+                    LIMIT 5
+                )
+                """
+            ),
+            {
+                "provider": provider,
+                "season_id": season_id,
+                "date": date,
+                "home": home_team_id,
+                "away": away_team_id,
+            },
+        ).mappings().all()
+
+        home_last = [r for r in last_rows if r["side"] == "home"]
+        away_last = [r for r in last_rows if r["side"] == "away"]
+
+        # 4) Resolve every team name in ONE round-trip instead of one
+        #    SELECT per row (up to ~22 queries before).
+        ids = {home_team_id, away_team_id}
+        for r in home_last:
+            ids.add(r["home_team_id"])
+            ids.add(r["away_team_id"])
+        for r in away_last:
+            ids.add(r["home_team_id"])
+            ids.add(r["away_team_id"])
+
+        name_rows = conn.execute(
+            text(
+                """
+                SELECT team_id, team_name
+                FROM public.teams
+                WHERE team_id = ANY(:ids)
+                """
+            ),
+            {"ids": list(ids)},
+        ).mappings().all()
+        name_by_id = {r["team_id"]: r["team_name"] for r in name_rows}
+
+        def team_name(team_id: int) -> str:
+            return name_by_id.get(team_id) or f"[unknown:{team_id}]"
+
+        print("\n=== RANDOM FIXTURE ===")
+        print(f"Fixture ID : {fixture_id}")
+        print(f"Season ID  : {season_id}")
+        print(f"Date       : {date}")
+        print(f"Home Team  : {team_name(home_team_id)} ({home_team_id})")
+        print(f"Away Team  : {team_name(away_team_id)} ({away_team_id})")
+
         print("\n=== PREVIOUS_MATCHES ENTRIES ===")
         for row in prev_matches:
             print(dict(row))
 
-        # Helper function to fetch last 5 games
-        def last_games(team_id: int):
-            return conn.execute(
-                text(
-                    """
-                    SELECT *
-                    FROM public.fixtures
-                    WHERE provider = :provider
-                      AND season_id = :season_id
-                      AND date < :date
-                      AND (home_team_id = :team_id OR away_team_id = :team_id)
-                    ORDER BY date DESC
-                    LIMIT 5
-                    """
-                ),
-                {
-                    "provider": provider,
-                    "season_id": season_id,
-                    "date": date,
-                    "team_id": team_id,
-                },
-            ).mappings().all()
-
-        # 3) Fetch last 5 fixtures for both teams
-        home_last = last_games(home_team_id)
-        away_last = last_games(away_team_id)
-
         print("\n=== LAST 5 FIXTURES (HOME TEAM) ===")
         for r in home_last:
-            h_name = team_name(conn, r["home_team_id"])
-            a_name = team_name(conn, r["away_team_id"])
-
             print(
                 f"{r['fixture_id']} | {r['date']} | "
-                f"{h_name} vs {a_name} "
+                f"{team_name(r['home_team_id'])} vs {team_name(r['away_team_id'])} "
                 f"({r['home_goals']}:{r['away_goals']})"
             )
 
         print("\n=== LAST 5 FIXTURES (AWAY TEAM) ===")
         for r in away_last:
-            h_name = team_name(conn, r["home_team_id"])
-            a_name = team_name(conn, r["away_team_id"])
-
             print(
                 f"{r['fixture_id']} | {r['date']} | "
-                f"{h_name} vs {a_name} "
+                f"{team_name(r['home_team_id'])} vs {team_name(r['away_team_id'])} "
                 f"({r['home_goals']}:{r['away_goals']})"
             )
 